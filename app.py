@@ -1,7 +1,11 @@
 """Main application orchestrator for Q4 calculations."""
 
+import itertools
 import logging
+import re
+from collections import defaultdict
 from typing import List, Optional, Dict
+from pymongo.errors import OperationFailure
 from config.database import DatabaseConfig, DatabaseConnection
 from repositories.financial_repository import FinancialDataRepository
 from services.q4_calculation_service import Q4CalculationService
@@ -9,14 +13,49 @@ from services.cashflow_fix_service import CashFlowFixService
 from services.gross_profit_service import GrossProfitService
 
 
+# Errors that are expected during normal runs and hidden from the non-verbose summary
+_EXPECTED_SKIP_RE = re.compile(
+    r"q4 value already exists|missing values:|concept not found", re.IGNORECASE
+)
+
+
 class Q4CalculationApp:
     """Main application for Q4 calculations."""
     
+    # Error categories in display order; only the first five get sample errors logged
+    ERROR_CATEGORIES = (
+        "Missing all values",
+        "Missing Q4 data only",
+        "Missing Annual data",
+        "Missing some quarterly data",
+        "Q4 already exists",
+        "Metadata issues",
+        "Other"
+    )
+    SAMPLED_ERROR_CATEGORIES = ERROR_CATEGORIES[:5]
+    
     def __init__(self, verbose: bool = False):
         self.config = DatabaseConfig()
         self.verbose = verbose
         self.setup_logging()
     
+    def ensure_indexes(self) -> List[str]:
+        """Create the indexes the calculation queries rely on (--ensure-indexes).
+        
+        Returns:
+            Error messages for the indexes that could not be created
+        """
+        try:
+            with DatabaseConnection(self.config) as db:
+                errors = FinancialDataRepository(db).ensure_indexes()
+        except Exception as e:
+            self.logger.error("Could not create indexes: %s", e)
+            raise
+        
+        for error in errors:
+            self.logger.warning("Could not create index %s", error)
+        return errors
+    
     def resolve_tickers_to_ciks(self, tickers: List[str]) -> Dict[str, Optional[str]]:
         """Resolve ticker symbols to CIK numbers using the companies collection.
         
@@ -29,19 +68,28 @@ class Q4CalculationApp:
         result = {}
         try:
             with DatabaseConnection(self.config) as db:
-                companies_collection = db["companies"]
-                for ticker in tickers:
-                    ticker_clean = ticker.strip().upper()
-                    company = companies_collection.find_one({"ticker_symbol": ticker_clean})
+                tickers_clean = [ticker.strip().upper() for ticker in tickers]
+                
+                # Look up all tickers in one round-trip (first document per ticker wins)
+                companies_by_ticker = {}
+                for company in db["companies"].find(
+                    {"ticker_symbol": {"$in": tickers_clean}},
+                    {"_id": 0, "ticker_symbol": 1, "cik": 1, "name": 1}
+                ):
+                    companies_by_ticker.setdefault(company["ticker_symbol"], company)
+                
+                for ticker_clean in tickers_clean:
+                    company = companies_by_ticker.get(ticker_clean)
                     if company and company.get("cik"):
                         result[ticker_clean] = company["cik"]
-                        if self.verbose:
-                            self.logger.info(f"Resolved {ticker_clean} -> CIK {company['cik']} ({company.get('name', '')})")
+                        self.logger.info(
+                            "Resolved %s -> CIK %s (%s)", ticker_clean, company["cik"], company.get("name", "")
+                        )
                     else:
                         result[ticker_clean] = None
-                        self.logger.warning(f"Ticker '{ticker_clean}' not found in companies collection")
+                        self.logger.warning("Ticker '%s' not found in companies collection", ticker_clean)
         except Exception as e:
-            self.logger.error(f"Error resolving tickers: {e}")
+            self.logger.error("Error resolving tickers: %s", e)
             for ticker in tickers:
                 result[ticker.strip().upper()] = None
         return result
@@ -62,10 +110,9 @@ class Q4CalculationApp:
                     line = line.strip()
                     if line and not line.startswith('#'):
                         tickers.append(line)
-            if self.verbose:
-                self.logger.info(f"Read {len(tickers)} ticker(s) from {filepath}")
+            self.logger.info("Read %d ticker(s) from %s", len(tickers), filepath)
         except Exception as e:
-            self.logger.error(f"Error reading ticker file {filepath}: {e}")
+            self.logger.error("Error reading ticker file %s: %s", filepath, e)
             raise
         return tickers
     
@@ -93,8 +140,7 @@ class Q4CalculationApp:
                        "cf" (cash flows), or "all" (both). Default: "all".
         """
         
-        if self.verbose:
-            self.logger.info("Starting Q4 calculation process...")
+        self.logger.info("Starting Q4 calculation process...")
         
         try:
             with DatabaseConnection(self.config) as db:
@@ -103,11 +149,9 @@ class Q4CalculationApp:
                 
                 # Remove existing Q4 values if recalculate flag is set
                 if recalculate:
-                    if self.verbose:
-                        self.logger.info("Recalculate mode: Removing existing Q4 values...")
+                    self.logger.info("Recalculate mode: Removing existing Q4 values...")
                     deleted_count = repository.delete_all_q4_values(company_cik)
-                    if self.verbose:
-                        self.logger.info(f"Deleted {deleted_count} existing Q4 values")
+                    self.logger.info("Deleted %d existing Q4 values", deleted_count)
                 
                 if company_cik:
                     # Process specific company
@@ -117,7 +161,7 @@ class Q4CalculationApp:
                     self._process_all_companies(service, repository, statement)
                     
         except Exception as e:
-            self.logger.error(f"Application error: {e}")
+            self.logger.error("Application error: %s", e)
             raise
     
     def run_gross_profit_calculation(
@@ -138,8 +182,7 @@ class Q4CalculationApp:
             recalculate: If True, recalculates even if Gross Profit already exists.
         """
         
-        if self.verbose:
-            self.logger.info("Starting Gross Profit calculation process...")
+        self.logger.info("Starting Gross Profit calculation process...")
         
         try:
             with DatabaseConnection(self.config) as db:
@@ -166,7 +209,7 @@ class Q4CalculationApp:
                     self._log_overall_gross_profit_results(overall_results)
                     
         except Exception as e:
-            self.logger.error(f"Application error: {e}")
+            self.logger.error("Application error: %s", e)
             raise
     
     def run_cashflow_fix(
@@ -190,8 +233,7 @@ class Q4CalculationApp:
             force: If True, re-fix all records regardless of whether they were already fixed.
         """
         
-        if self.verbose:
-            self.logger.info("Starting cash flow fix process...")
+        self.logger.info("Starting cash flow fix process...")
         
         try:
             with DatabaseConnection(self.config) as db:
@@ -226,7 +268,7 @@ class Q4CalculationApp:
                     self._log_overall_cashflow_fix_results(overall_results)
                     
         except Exception as e:
-            self.logger.error(f"Application error: {e}")
+            self.logger.error("Application error: %s", e)
             raise
     
     def _process_company(
@@ -241,20 +283,17 @@ class Q4CalculationApp:
             statement: "is", "cf", or "all".
         """
         
-        if self.verbose:
-            self.logger.info(f"Processing Q4 calculations for company: {company_cik}")
+        self.logger.info("Processing Q4 calculations for company: %s", company_cik)
         
         # Process income statement
         if statement in ("is", "all"):
-            if self.verbose:
-                self.logger.info(f"Calculating income statement Q4 for {company_cik}...")
+            self.logger.info("Calculating income statement Q4 for %s...", company_cik)
             income_results = service.calculate_q4_for_company(company_cik)
             self._log_results(company_cik, income_results)
         
         # Process cash flow statement
         if statement in ("cf", "all"):
-            if self.verbose:
-                self.logger.info(f"Calculating cash flow statement Q4 for {company_cik}...")
+            self.logger.info("Calculating cash flow statement Q4 for %s...", company_cik)
             cashflow_results = service.calculate_q4_for_cash_flow(company_cik)
             self._log_results(company_cik, cashflow_results)
     
@@ -270,18 +309,23 @@ class Q4CalculationApp:
             statement: "is", "cf", or "all".
         """
         
-        if self.verbose:
-            self.logger.info("Processing Q4 calculations for all companies...")
+        # Cache hot attribute lookups as locals for the per-company loop
+        logger = self.logger
+        
+        logger.info("Processing Q4 calculations for all companies...")
         
         # Get all unique company CIKs
         companies = self._get_all_companies(repository)
         
         if not companies:
-            self.logger.warning("No companies found in the database")
+            logger.warning("No companies found in the database")
             return
         
-        if self.verbose:
-            self.logger.info(f"Found {len(companies)} companies to process")
+        total_companies = len(companies)
+        process_income = statement in ("is", "all")
+        process_cashflow = statement in ("cf", "all")
+        
+        logger.info("Found %d companies to process", total_companies)
         
         total_processed = 0
         total_successful = 0
@@ -289,39 +333,46 @@ class Q4CalculationApp:
         
         for idx, company_cik in enumerate(companies, 1):
             try:
-                if self.verbose:
-                    self.logger.info(f"Processing company {idx}/{len(companies)}: {company_cik}")
+                logger.info("Processing company %d/%d: %s", idx, total_companies, company_cik)
                 
                 # Process income statement
-                if statement in ("is", "all"):
-                    if self.verbose:
-                        self.logger.info(f"  → Income Statement Q4 calculations")
+                if process_income:
+                    logger.info("  → Income Statement Q4 calculations")
                     income_results = service.calculate_q4_for_company(company_cik)
                     self._log_results(company_cik, income_results)
                     
-                    total_processed += income_results["processed_concepts"]
-                    total_successful += income_results["successful_calculations"]
-                    total_skipped += income_results["skipped_concepts"]
+                    processed, successful, skipped = (
+                        income_results["processed_concepts"],
+                        income_results["successful_calculations"],
+                        income_results["skipped_concepts"]
+                    )
+                    total_processed += processed
+                    total_successful += successful
+                    total_skipped += skipped
                 
                 # Process cash flow statement
-                if statement in ("cf", "all"):
-                    if self.verbose:
-                        self.logger.info(f"  → Cash Flow Statement Q4 calculations")
+                if process_cashflow:
+                    logger.info("  → Cash Flow Statement Q4 calculations")
                     cashflow_results = service.calculate_q4_for_cash_flow(company_cik)
                     self._log_results(company_cik, cashflow_results)
                     
-                    total_processed += cashflow_results["processed_concepts"]
-                    total_successful += cashflow_results["successful_calculations"]
-                    total_skipped += cashflow_results["skipped_concepts"]
+                    processed, successful, skipped = (
+                        cashflow_results["processed_concepts"],
+                        cashflow_results["successful_calculations"],
+                        cashflow_results["skipped_concepts"]
+                    )
+                    total_processed += processed
+                    total_successful += successful
+                    total_skipped += skipped
                 
             except Exception as e:
-                self.logger.error(f"Error processing company {company_cik}: {e}")
+                logger.error("Error processing company %s: %s", company_cik, e)
         
         # Log summary (always show)
         print("=" * 60)
         print("🎯 Q4 CALCULATION SUMMARY")
         print("=" * 60)
-        print(f"📊 Companies processed: {len(companies)}")
+        print(f"📊 Companies processed: {total_companies}")
         print(f"📈 Concepts processed: {total_processed}")
         print(f"✅ Successful Q4 calculations: {total_successful}")
         print(f"⏭️  Skipped concepts: {total_skipped}")
@@ -334,17 +385,23 @@ class Q4CalculationApp:
     
     def _get_all_companies(self, repository: FinancialDataRepository) -> List[str]:
         """Get all unique company CIKs from the database."""
+        collection = repository.concept_values_annual
         try:
-            pipeline = [
-                {"$group": {"_id": "$company_cik"}},
-                {"$sort": {"_id": 1}}
-            ]
+            # distinct() walks the company_cik index (see ensure_indexes) instead of
+            # grouping the collection
+            try:
+                ciks = collection.distinct("company_cik")
+            except OperationFailure:
+                # distinct results are capped at 16MB; fall back to a disk-backed group
+                pipeline = [
+                    {"$group": {"_id": "$company_cik"}}
+                ]
+                ciks = [item["_id"] for item in collection.aggregate(pipeline, allowDiskUse=True)]
             
-            result = list(repository.concept_values_annual.aggregate(pipeline))
-            return [item["_id"] for item in result if item["_id"]]
+            return sorted(c for c in ciks if c)
             
         except Exception as e:
-            self.logger.error(f"Error getting companies list: {e}")
+            self.logger.error("Error getting companies list: %s", e)
             return []
     
     def _log_results(self, company_cik: str, results: dict) -> None:
@@ -352,96 +409,89 @@ class Q4CalculationApp:
         
         statement_type = results.get("statement_type", "Unknown")
         
-        # In verbose mode, show full details
-        if self.verbose:
-            # Main results summary
-            self.logger.info(f"Results for company {company_cik} ({statement_type}):")
-            self.logger.info(f"  📊 Processed concepts: {results['processed_concepts']}")
-            self.logger.info(f"  ✅ Successful calculations: {results['successful_calculations']}")
-            self.logger.info(f"  ⏭️  Skipped concepts: {results['skipped_concepts']}")
-            
-            # Add explanation for cash flows if no successful calculations
-            if statement_type == "cash_flows" and results['successful_calculations'] == 0:
-                if results['processed_concepts'] > 0:
-                    self.logger.info(f"  💡 Note: Cash flow statements often lack quarterly data (Q1, Q2, Q3) needed for Q4 calculation")
+        # Full details are logged at INFO level, so they only show up in verbose mode
+        # (logging skips the formatting entirely when the level filters them out)
+        self.logger.info("Results for company %s (%s):", company_cik, statement_type)
+        self.logger.info("  📊 Processed concepts: %d", results['processed_concepts'])
+        self.logger.info("  ✅ Successful calculations: %d", results['successful_calculations'])
+        self.logger.info("  ⏭️  Skipped concepts: %d", results['skipped_concepts'])
+        
+        # Add explanation for cash flows if no successful calculations
+        if statement_type == "cash_flows" and results['successful_calculations'] == 0:
+            if results['processed_concepts'] > 0:
+                self.logger.info("  💡 Note: Cash flow statements often lack quarterly data (Q1, Q2, Q3) needed for Q4 calculation")
         
         # Show errors (both verbose and non-verbose mode, but different detail levels)
         if results["errors"]:
-            # Categorize errors for better insights
-            error_categories = self._categorize_errors(results["errors"])
-            
             # In non-verbose mode, only show if there are actual errors (not just existing Q4)
             if not self.verbose:
-                # Only show errors that aren't "Q4 already exists" and aren't just missing data
-                real_errors = []
-                for error in results["errors"]:
-                    error_lower = error.lower()
-                    if ("q4 value already exists" not in error_lower and 
-                        "missing values:" not in error_lower and
-                        "concept not found" not in error_lower):
-                        real_errors.append(error)
+                # Only show errors that aren't "Q4 already exists" and aren't just missing data.
+                # One pass: take the first 3 as samples, then count whatever is left.
+                real_errors = (e for e in results["errors"] if not _EXPECTED_SKIP_RE.search(e))
+                samples = list(itertools.islice(real_errors, 3))
                 
-                if real_errors:
-                    print(f"⚠️  Errors in {company_cik} ({statement_type}): {len(real_errors)} issues found")
+                if samples:
+                    remaining = sum(1 for _ in real_errors)
+                    print(f"⚠️  Errors in {company_cik} ({statement_type}): {len(samples) + remaining} issues found")
                     # Show just a few examples of real errors
-                    for error in real_errors[:3]:
+                    for error in samples:
                         print(f"  - {error}")
-                    if len(real_errors) > 3:
-                        print(f"  ... and {len(real_errors) - 3} more errors")
+                    if remaining:
+                        print(f"  ... and {remaining} more errors")
             else:
+                # Categorize errors for better insights (one pass, reused for the samples)
+                categorized_errors = self._categorize_errors(results["errors"])
+                
                 # Verbose mode: show full error details
-                self.logger.warning(f"  ⚠️  Issues found: {len(results['errors'])}")
+                self.logger.warning("  ⚠️  Issues found: %d", len(results['errors']))
                 
                 # Log summary by category
-                for category, count in error_categories.items():
-                    if count > 0:
-                        self.logger.warning(f"    • {category}: {count} concepts")
+                for category, category_errors in categorized_errors.items():
+                    if category_errors:
+                        self.logger.warning("    • %s: %d concepts", category, len(category_errors))
                 
                 # Show sample errors for main categories (limit to prevent log spam)
-                self._log_sample_errors(results["errors"], error_categories)
+                self._log_sample_errors(results["errors"], categorized_errors)
             
         # Success rate calculation (verbose mode only)
-        if self.verbose and results['processed_concepts'] > 0:
-            success_rate = (results['successful_calculations'] / results['processed_concepts']) * 100
-            self.logger.info(f"  📈 Success rate: {success_rate:.1f}%")
+        if results['processed_concepts'] > 0:
+            self.logger.info(
+                "  📈 Success rate: %.1f%%",
+                (results['successful_calculations'] / results['processed_concepts']) * 100
+            )
         
         # In non-verbose mode, show final summary for each company
         if not self.verbose:
             print(f"📊 {company_cik} ({statement_type}): {results['successful_calculations']} successful calculations, {results['skipped_concepts']} skipped")
     
-    def _categorize_errors(self, errors: List[str]) -> dict:
-        """Categorize errors to provide better insights."""
-        categories = {
-            "Missing all values": 0,
-            "Missing Q4 data only": 0,
-            "Missing Annual data": 0,
-            "Missing some quarterly data": 0,
-            "Q4 already exists": 0,
-            "Metadata issues": 0,
-            "Other": 0
-        }
-        
+    @staticmethod
+    def _classify_error(error: str) -> str:
+        """Return the category name for a single error message."""
+        error_lower = error.lower()
+        
+        if "missing values: q1, q2, q3, annual" in error_lower:
+            return "Missing all values"
+        if "missing values: q1, q2, q3" in error_lower:
+            return "Missing Q4 data only"
+        if "annual" in error_lower and "missing" in error_lower:
+            return "Missing Annual data"
+        if "missing values:" in error_lower:
+            return "Missing some quarterly data"
+        if "q4 value already exists" in error_lower:
+            return "Q4 already exists"
+        if "metadata" in error_lower or "concept not found" in error_lower:
+            return "Metadata issues"
+        return "Other"
+    
+    def _categorize_errors(self, errors: List[str]) -> Dict[str, List[str]]:
+        """Group errors by category in a single pass to provide better insights."""
+        categorized = defaultdict(list)
         for error in errors:
-            error_lower = error.lower()
-            
-            if "missing values: q1, q2, q3, annual" in error_lower:
-                categories["Missing all values"] += 1
-            elif "missing values: q1, q2, q3" in error_lower:
-                categories["Missing Q4 data only"] += 1
-            elif "annual" in error_lower and "missing" in error_lower:
-                categories["Missing Annual data"] += 1
-            elif "missing values:" in error_lower:
-                categories["Missing some quarterly data"] += 1
-            elif "q4 value already exists" in error_lower:
-                categories["Q4 already exists"] += 1
-            elif "metadata" in error_lower or "concept not found" in error_lower:
-                categories["Metadata issues"] += 1
-            else:
-                categories["Other"] += 1
+            categorized[self._classify_error(error)].append(error)
         
-        return categories
+        return {category: categorized[category] for category in self.ERROR_CATEGORIES}
     
-    def _log_sample_errors(self, errors: List[str], categories: dict) -> None:
+    def _log_sample_errors(self, errors: List[str], categorized_errors: Dict[str, List[str]]) -> None:
         """Log sample errors for each major category to help with debugging."""
         
         max_samples_per_category = 2
@@ -453,52 +503,24 @@ class Q4CalculationApp:
             max_samples_per_category = len(errors)
             max_total_samples = len(errors)
         
-        # Group errors by category
-        categorized_errors = {
-            "Missing all values": [],
-            "Missing Q4 data only": [],
-            "Missing Annual data": [],
-            "Missing some quarterly data": [],
-            "Q4 already exists": [],
-            "Metadata issues": [],
-            "Other": []
-        }
-        
-        for error in errors:
-            if total_logged >= max_total_samples:
-                break
-                
-            error_lower = error.lower()
-            
-            if "missing values: q1, q2, q3, annual" in error_lower and len(categorized_errors["Missing all values"]) < max_samples_per_category:
-                categorized_errors["Missing all values"].append(error)
-                total_logged += 1
-            elif "missing values: q1, q2, q3" in error_lower and len(categorized_errors["Missing Q4 data only"]) < max_samples_per_category:
-                categorized_errors["Missing Q4 data only"].append(error)
-                total_logged += 1
-            elif "annual" in error_lower and "missing" in error_lower and len(categorized_errors["Missing Annual data"]) < max_samples_per_category:
-                categorized_errors["Missing Annual data"].append(error)
-                total_logged += 1
-            elif "missing values:" in error_lower and len(categorized_errors["Missing some quarterly data"]) < max_samples_per_category:
-                categorized_errors["Missing some quarterly data"].append(error)
-                total_logged += 1
-            elif "q4 value already exists" in error_lower and len(categorized_errors["Q4 already exists"]) < max_samples_per_category:
-                categorized_errors["Q4 already exists"].append(error)
-                total_logged += 1
-        
         # Log sample errors for significant categories
-        for category, category_errors in categorized_errors.items():
-            if category_errors and categories[category] > 0:
-                self.logger.warning(f"      {category} examples:")
-                for error in category_errors:
-                    # Truncate very long concept names for readability
-                    display_error = self._truncate_error_message(error)
-                    self.logger.warning(f"        - {display_error}")
+        for category in self.SAMPLED_ERROR_CATEGORIES:
+            samples = categorized_errors[category][:min(
+                max_samples_per_category, max_total_samples - total_logged
+            )]
+            if not samples:
+                continue
+            
+            total_logged += len(samples)
+            self.logger.warning("      %s examples:", category)
+            for error in samples:
+                # Truncate very long concept names for readability
+                self.logger.warning("        - %s", self._truncate_error_message(error))
         
         # Show additional count if there are many more errors
         remaining_errors = len(errors) - total_logged
         if remaining_errors > 0 and not self.verbose:
-            self.logger.warning(f"      ... and {remaining_errors} more issues (use --verbose for full details)")
+            self.logger.warning("      ... and %d more issues (use --verbose for full details)", remaining_errors)
     
     def _truncate_error_message(self, error: str, max_length: int = 120) -> str:
         """Truncate long error messages for better readability."""
@@ -671,6 +693,9 @@ Examples:
   uv run app.py --cal-gross-profit --all-companies --recalculate  # Recalculate existing values
   uv run app.py --cal-gross-profit --cik 0000789019 --verbose     # Process with detailed output
   uv run app.py --cal-gross-profit --file process_stocks.txt      # Process tickers from file
+  
+  # Index setup (one-time, creates the indexes the calculation queries use):
+  uv run app.py --ensure-indexes
 
 The Q4 system calculates Q4 using: Q4 = Annual - (Q1 + Q2 + Q3)
 The --fix-cashflow process converts cumulative values: Q2 = Q2 - Q1, Q3 = Q3 - Q2
@@ -678,8 +703,8 @@ The --fix-cashflow process converts cumulative values: Q2 = Q2 - Q1, Q3 = Q3 - Q
   - Use --force to re-fix all records regardless of cashflow_fixed status
 The --cal-gross-profit calculates: Gross Profit = Total Revenues - Cost of Revenues
 
-Note: You must specify either --calculate-q4, --fix-cashflow, or --cal-gross-profit
-Note: You must specify either --all-companies, --cik <CIK> [<CIK> ...], or --file <FILE>
+Note: You must specify either --calculate-q4, --fix-cashflow, --cal-gross-profit, or --ensure-indexes
+Note: You must specify either --all-companies, --cik <CIK> [<CIK> ...], or --file <FILE> (except with --ensure-indexes)
 Note: --file <FILE> reads ticker symbols (one per line) and resolves them to CIKs via the companies collection
 Note: --statement works only with --calculate-q4  (choices: is, cf, all — default: all)
 Note: --fiscal-year and --quarter work only with --fix-cashflow and a single --cik
@@ -720,6 +745,12 @@ Note: --force works with --fix-cashflow to re-fix already fixed records
         help='Calculate and insert Gross Profit values (Gross Profit = Total Revenues - Cost of Revenues)'
     )
     
+    parser.add_argument(
+        '--ensure-indexes',
+        action='store_true',
+        help='Create the MongoDB indexes used by the calculations and exit (one-time setup)'
+    )
+    
     parser.add_argument(
         '--all-companies',
         action='store_true',
@@ -781,15 +812,18 @@ Note: --force works with --fix-cashflow to re-fix already fixed records
     args = parser.parse_args()
     
     # Validate arguments
-    if not args.calculate_q4 and not args.fix_cashflow and not args.cal_gross_profit:
-        parser.error("You must specify either --calculate-q4, --fix-cashflow, or --cal-gross-profit")
+    if not args.calculate_q4 and not args.fix_cashflow and not args.cal_gross_profit and not args.ensure_indexes:
+        parser.error("You must specify either --calculate-q4, --fix-cashflow, --cal-gross-profit, or --ensure-indexes")
     
     # Check for mutually exclusive operations
-    operations = sum([args.calculate_q4, args.fix_cashflow, args.cal_gross_profit])
+    operations = sum([args.calculate_q4, args.fix_cashflow, args.cal_gross_profit, args.ensure_indexes])
     if operations > 1:
-        parser.error("Cannot specify multiple operations. Choose one: --calculate-q4, --fix-cashflow, or --cal-gross-profit")
+        parser.error("Cannot specify multiple operations. Choose one: --calculate-q4, --fix-cashflow, --cal-gross-profit, or --ensure-indexes")
     
-    if not args.all_companies and not args.cik and not args.file:
+    if args.ensure_indexes:
+        if args.all_companies or args.cik or args.file:
+            parser.error("--ensure-indexes does not take --all-companies, --cik, or --file")
+    elif not args.all_companies and not args.cik and not args.file:
         parser.error("You must specify --all-companies, --cik <CIK> [<CIK> ...], or --file <FILE>")
     
     if sum([bool(args.all_companies), bool(args.cik), bool(args.file)]) > 1:
@@ -826,9 +860,24 @@ Note: --force works with --fix-cashflow to re-fix already fixed records
     cik_list: Optional[List[str]] = args.cik if args.cik else None  # None means all-companies mode
     ticker_source: Optional[str] = None  # Track if CIKs came from a ticker file
     
+    # One app (and logger setup) serves both ticker resolution and the run itself
+    app = Q4CalculationApp(verbose=args.verbose)
+    
+    if args.ensure_indexes:
+        print("Creating MongoDB indexes...")
+        try:
+            errors = app.ensure_indexes()
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
+        if errors:
+            print(f"\n⚠️  {len(errors)} index(es) could not be created (see warnings above)")
+            sys.exit(1)
+        print("\n✅ Indexes created successfully!")
+        return
+    
     # Resolve tickers from --file to CIKs
     if args.file:
-        app = Q4CalculationApp(verbose=args.verbose)
         tickers = app.read_tickers_from_file(args.file)
         if not tickers:
             print(f"❌ No ticker symbols found in {args.file}")
@@ -847,15 +896,12 @@ Note: --force works with --fix-cashflow to re-fix already fixed records
             print("❌ No valid CIKs resolved from the ticker file")
             sys.exit(1)
         ticker_source = args.file
-        if app.verbose:
-            app.logger.info(f"Resolved {len(cik_list)} CIK(s) from ticker file {args.file}")
+        app.logger.info("Resolved %d CIK(s) from ticker file %s", len(cik_list), args.file)
         
         # Warn if --fiscal-year/--quarter used with multiple CIKs from file
         if (args.fiscal_year or args.quarter) and len(cik_list) > 1:
             print(f"⚠️  Warning: --fiscal-year/--quarter with --file resolved to {len(cik_list)} companies; filters will be applied per-company")
     
-    app = Q4CalculationApp(verbose=args.verbose)
-    
     # Execute the appropriate command
     if args.cal_gross_profit:
         # Gross Profit calculation mode
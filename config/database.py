@@ -1,12 +1,10 @@
 """Database configuration and connection management."""
 
 import os
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 try:
     from pymongo import MongoClient
     from pymongo.database import Database
@@ -15,12 +13,31 @@ except ImportError:
     raise
 
 
+@lru_cache(maxsize=None)
+def _load_env() -> None:
+    """Load .env into the environment once per process, on first use."""
+    load_dotenv()
+
+
+def _get_int_env(name: str) -> Optional[int]:
+    """Read an optional integer setting from the environment (None when unset)."""
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
 class DatabaseConfig:
     """Configuration class for database settings."""
     
     def __init__(self):
+        _load_env()
         self.mongodb_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
         self.target_db_name = os.getenv("TARGET_DB_NAME", "normalize_data")
+        # Pool and timeout overrides; unset keeps the driver defaults
+        self.max_pool_size = _get_int_env("MONGODB_MAX_POOL_SIZE")
+        self.min_pool_size = _get_int_env("MONGODB_MIN_POOL_SIZE")
+        self.server_selection_timeout_ms = _get_int_env("MONGODB_SERVER_SELECTION_TIMEOUT_MS")
+        # Wire compression, e.g. "zstd,zlib" (zstd needs the zstandard package)
+        self.compressors = os.getenv("MONGODB_COMPRESSORS") or None
     
     def get_connection_string(self) -> str:
         """Get MongoDB connection string."""
@@ -29,10 +46,24 @@ class DatabaseConfig:
     def get_database_name(self) -> str:
         """Get target database name."""
         return self.target_db_name
+    
+    def get_client(self) -> MongoClient:
+        """Get the shared MongoClient for these settings."""
+        return get_client(
+            self.mongodb_uri,
+            max_pool_size=self.max_pool_size,
+            min_pool_size=self.min_pool_size,
+            server_selection_timeout_ms=self.server_selection_timeout_ms,
+            compressors=self.compressors
+        )
 
 
 class DatabaseConnection:
-    """Database connection manager."""
+    """Database connection manager.
+    
+    Connections borrow the process-wide client from get_client(), so opening one
+    per run reuses the existing pool; close() only releases this manager's handles.
+    """
     
     def __init__(self, config: DatabaseConfig):
         self.config = config
@@ -42,7 +73,7 @@ class DatabaseConnection:
     def connect(self) -> Database:
         """Establish connection to MongoDB database."""
         if self._client is None:
-            self._client = MongoClient(self.config.get_connection_string())
+            self._client = self.config.get_client()
         
         if self._database is None:
             if self._client is not None:
@@ -54,11 +85,9 @@ class DatabaseConnection:
         return self._database
     
     def close(self):
-        """Close database connection."""
-        if self._client:
-            self._client.close()
-            self._client = None
-            self._database = None
+        """Release the database connection (the shared client stays open)."""
+        self._client = None
+        self._database = None
     
     def __enter__(self):
         """Context manager entry."""
@@ -67,3 +96,34 @@ class DatabaseConnection:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         self.close()
+
+
+@lru_cache(maxsize=None)
+def get_client(
+    uri: str,
+    max_pool_size: Optional[int] = None,
+    min_pool_size: Optional[int] = None,
+    server_selection_timeout_ms: Optional[int] = None,
+    compressors: Optional[str] = None
+) -> MongoClient:
+    """Get a shared MongoClient for a connection string.
+    
+    Clients are cached per URI (and pool settings) so callers in the same process
+    reuse one connection pool instead of repeating the TCP/auth handshake. The
+    cache is unbounded: the settings come from the environment, so there are only
+    a few of them, and evicting an entry would drop a live client without closing
+    its pool. Settings left as None keep the driver defaults (maxPoolSize 100,
+    minPoolSize 0, serverSelectionTimeoutMS 30000).
+    """
+    options = {
+        "maxPoolSize": max_pool_size,
+        "minPoolSize": min_pool_size,
+        "serverSelectionTimeoutMS": server_selection_timeout_ms,
+        "compressors": compressors
+    }
+    
+    return MongoClient(
+        uri,
+        retryReads=True,
+        **{key: value for key, value in options.items() if value is not None}
+    )
@@ -11,7 +11,7 @@ except ImportError:
     raise
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportingPeriod:
     """Represents a reporting period for financial data."""
     end_date: datetime
@@ -32,7 +32,7 @@ class ReportingPeriod:
     note: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ConceptValue:
     """Represents a financial concept value."""
     concept_id: ObjectId
@@ -48,7 +48,7 @@ class ConceptValue:
     dimensional_concept_id: Optional[ObjectId] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class QuarterlyData:
     """Represents quarterly data for a specific concept and fiscal year."""
     concept_id: Optional[ObjectId]
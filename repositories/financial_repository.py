@@ -1,12 +1,14 @@
 """Data repository for financial data operations - Refactored with DRY principles."""
 
-from typing import List, Dict, Optional, Any, Tuple
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Any, Set, Tuple, Iterator
 from datetime import datetime
 
 try:
     from bson import ObjectId
     from pymongo.database import Database
     from pymongo.collection import Collection
+    from pymongo.errors import OperationFailure
 except ImportError:
     print("PyMongo not installed. Please run: pip install pymongo")
     raise
@@ -14,15 +16,165 @@ except ImportError:
 from models.financial_data import QuarterlyData, ConceptValue, ReportingPeriod
 
 
+# Marks a lookup that isn't memoized (None is a valid memoized result)
+_NOT_CACHED = object()
+
+
 class FinancialDataRepository:
     """Repository for financial data operations."""
     
+    # Projection for quarterly value reads - only the fields the calculations use, so
+    # heavy fields (notes, raw XBRL context) never cross the wire or get decoded into
+    # dicts.
+    QUARTERLY_VALUE_PROJECTION = {"_id": 0, "reporting_period.quarter": 1, "value": 1}
+    
+    # Projection for annual record reads: the annual value plus the metadata the Q4
+    # record copies (its reporting period, statement type and dimension fields)
+    ANNUAL_RECORD_PROJECTION = {
+        "_id": 1,
+        "concept_id": 1,
+        "company_cik": 1,
+        "statement_type": 1,
+        "value": 1,
+        "reporting_period": 1,
+        "dimension_value": 1,
+        "dimensional_concept_id": 1
+    }
+    
+    # Projections for concept lookups - the fields concept matching reads (name, path,
+    # label, dimension member, and the keys the root-parent lookup filters on)
+    CONCEPT_MATCH_PROJECTION = {
+        "_id": 1,
+        "company_cik": 1,
+        "statement_type": 1,
+        "concept": 1,
+        "path": 1,
+        "label": 1,
+        "dimension_concept": 1,
+        "dimensions": 1
+    }
+    ROOT_CONCEPT_PROJECTION = {"_id": 1, "concept": 1}
+    
+    # Per-concept value indexes (created by ensure_indexes). The value reads don't
+    # hint them: a hint to a missing index fails the query instead of falling back
+    QUARTERLY_VALUE_INDEX = [
+        ("concept_id", 1),
+        ("company_cik", 1),
+        ("reporting_period.fiscal_year", 1),
+        ("reporting_period.quarter", 1)
+    ]
+    ANNUAL_VALUE_INDEX = [
+        ("concept_id", 1),
+        ("company_cik", 1),
+        ("reporting_period.fiscal_year", 1)
+    ]
+    
+    # Q4 lookup index on concept_values_quarterly (created by ensure_indexes): covers the
+    # existing-Q4 prefetch and bounds per-company Q4 deletes
+    Q4_KEY_INDEX = [
+        ("company_cik", 1),
+        ("reporting_period.quarter", 1),
+        ("concept_id", 1),
+        ("reporting_period.fiscal_year", 1)
+    ]
+    
+    # Concept lookup indexes on both normalized concept collections (created by
+    # ensure_indexes): by name (annual matching, quarterly resolution, and through its
+    # (company_cik, statement_type) prefix the statement concept listing) and by path
+    # (root-parent lookups, path + label fallbacks)
+    CONCEPT_NAME_INDEX = [
+        ("company_cik", 1),
+        ("statement_type", 1),
+        ("concept", 1),
+        ("path", 1)
+    ]
+    CONCEPT_PATH_INDEX = [
+        ("company_cik", 1),
+        ("statement_type", 1),
+        ("path", 1),
+        ("label", 1)
+    ]
+    
     def __init__(self, database: Database):
         self.db = database
         self.concept_values_quarterly: Collection = database["concept_values_quarterly"]
         self.concept_values_annual: Collection = database["concept_values_annual"]
         self.normalized_concepts_quarterly: Collection = database["normalized_concepts_quarterly"]
         self.normalized_concepts_annual: Collection = database["normalized_concepts_annual"]
+        
+        # Memoized concept resolution (quarterly -> annual concept matching). The
+        # result is the same for every fiscal year of a concept, so a company pass
+        # opens lookup_cache_scope() and reuses it across years. Outside a scope
+        # nothing is memoized.
+        self._lookup_cache: Optional[Dict[Tuple[Any, ...], Any]] = None
+    
+    @contextmanager
+    def lookup_cache_scope(self) -> Iterator[None]:
+        """Memoize concept lookups for the duration of one company pass.
+        
+        The cache is dropped on exit, so memory stays bounded by one company's
+        lookups and concepts written after the pass are seen by the next one.
+        """
+        previous_cache = self._lookup_cache
+        self._lookup_cache = {}
+        try:
+            yield
+        finally:
+            self._lookup_cache = previous_cache
+    
+    def _get_cached(self, cache_key: Tuple[Any, ...]) -> Any:
+        """Get a memoized lookup, or _NOT_CACHED (always outside lookup_cache_scope)."""
+        if self._lookup_cache is None:
+            return _NOT_CACHED
+        return self._lookup_cache.get(cache_key, _NOT_CACHED)
+    
+    def _set_cached(self, cache_key: Tuple[Any, ...], value: Any) -> None:
+        """Memoize a lookup if a lookup_cache_scope is open."""
+        if self._lookup_cache is not None:
+            self._lookup_cache[cache_key] = value
+    
+    # ==================== INDEX MANAGEMENT ====================
+    
+    def ensure_indexes(self) -> List[str]:
+        """Create the indexes the calculation queries rely on.
+        
+        Meant as an explicit setup step (app.py --ensure-indexes), not part of the
+        calculation runs. The queries don't depend on these indexes, only run faster
+        with them, so an index that can't be created (e.g. an existing index with the
+        same keys but another name or options) is reported and the remaining ones are
+        still created.
+        
+        Returns:
+            Error messages for the indexes that could not be created
+        """
+        indexes = [
+            # Company listing via distinct("company_cik")
+            (self.concept_values_annual, "company_cik"),
+            # Concept matching looks concepts up by name or by path (+ label) within a
+            # company/statement in both collections; these keep those find_one calls
+            # off a collection scan. The statement concept listing uses the name index's
+            # (company_cik, statement_type) prefix and filters abstract on the documents
+            (self.normalized_concepts_quarterly, self.CONCEPT_NAME_INDEX),
+            (self.normalized_concepts_quarterly, self.CONCEPT_PATH_INDEX),
+            (self.normalized_concepts_annual, self.CONCEPT_NAME_INDEX),
+            (self.normalized_concepts_annual, self.CONCEPT_PATH_INDEX),
+            # Existing-Q4 prefetch matches (company_cik, quarter) and reads concept_id and
+            # fiscal_year, so this index covers it without fetching the value documents
+            (self.concept_values_quarterly, self.Q4_KEY_INDEX),
+            # Per-concept value reads (Q4 inputs, gross profit inputs, existence checks)
+            # match on concept_id + company_cik + fiscal_year (+ quarter); with every
+            # predicate in the index they resolve to a bounded index walk
+            (self.concept_values_quarterly, self.QUARTERLY_VALUE_INDEX),
+            (self.concept_values_annual, self.ANNUAL_VALUE_INDEX)
+        ]
+        
+        errors = []
+        for collection, keys in indexes:
+            try:
+                collection.create_index(keys)
+            except OperationFailure as e:
+                errors.append(f"{collection.name} {keys}: {e}")
+        return errors
     
     # ==================== HELPER METHODS ====================
     
@@ -32,6 +184,25 @@ class FinancialDataRepository:
         statement_type: str,
         concept_name: Optional[str] = None,
         concept_path: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Find a quarterly concept by name and/or path (memoized, see _query_quarterly_concept)."""
+        cache_key = ("quarterly_concept", company_cik, statement_type, concept_name, concept_path)
+        cached = self._get_cached(cache_key)
+        if cached is not _NOT_CACHED:
+            return cached
+        
+        quarterly_concept = self._query_quarterly_concept(
+            company_cik, statement_type, concept_name, concept_path
+        )
+        self._set_cached(cache_key, quarterly_concept)
+        return quarterly_concept
+    
+    def _query_quarterly_concept(
+        self,
+        company_cik: str,
+        statement_type: str,
+        concept_name: Optional[str] = None,
+        concept_path: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """Find a quarterly concept by name and/or path.
         
@@ -57,7 +228,7 @@ class FinancialDataRepository:
                 "company_cik": company_cik,
                 "statement_type": statement_type,
                 "path": concept_path
-            })
+            }, {"dimensions": 1})
             
             # If annual concept found, use its dimension member to find quarterly concept
             if annual_concept:
@@ -65,17 +236,21 @@ class FinancialDataRepository:
                 if annual_dimensions and "explicitMember" in annual_dimensions:
                     annual_member = annual_dimensions["explicitMember"]
                     
-                    # Find quarterly concept with matching dimension member
-                    candidates = list(self.normalized_concepts_quarterly.find(base_query))
-                    for candidate in candidates:
-                        candidate_dimensions = candidate.get("dimensions", {})
-                        if candidate_dimensions.get("explicitMember") == annual_member:
-                            return candidate
+                    # Find quarterly concept with matching dimension member (filtered
+                    # server-side so only the matching concept comes back)
+                    candidate = self.normalized_concepts_quarterly.find_one({
+                        **base_query,
+                        "dimensions.explicitMember": annual_member
+                    }, self.CONCEPT_MATCH_PROJECTION)
+                    if candidate:
+                        return candidate
             
             # Fallback: try exact path match (for non-dimensional concepts)
             exact_query = base_query.copy()
             exact_query["path"] = concept_path
-            result = self.normalized_concepts_quarterly.find_one(exact_query)
+            result = self.normalized_concepts_quarterly.find_one(
+                exact_query, self.CONCEPT_MATCH_PROJECTION
+            )
             if result:
                 return result
             
@@ -87,7 +262,9 @@ class FinancialDataRepository:
             base_query["path"] = concept_path
         
         # Fallback: simple query
-        return self.normalized_concepts_quarterly.find_one(base_query)
+        return self.normalized_concepts_quarterly.find_one(
+            base_query, self.CONCEPT_MATCH_PROJECTION
+        )
     
 
 
@@ -114,12 +291,21 @@ class FinancialDataRepository:
         # Get the root level from path (e.g., "003.001" -> "003", "001.002.001" -> "001")
         root_path = concept_path.split('.')[0]
         
+        # Sibling concepts share a root, so the probe below is memoized per root path
+        cache_key = (
+            "root_parent", collection_name, root_path,
+            concept.get("company_cik"), concept.get("statement_type")
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not _NOT_CACHED:
+            return cached
+        
         # Find the root concept by path
         root_concept = collection.find_one({
             "path": root_path,
             "company_cik": concept.get("company_cik"),
             "statement_type": concept.get("statement_type")
-        })
+        }, self.ROOT_CONCEPT_PROJECTION)
         
         # If not found in same collection, try the other collection
         if not root_concept:
@@ -128,18 +314,20 @@ class FinancialDataRepository:
                     "path": root_path,
                     "company_cik": concept.get("company_cik"),
                     "statement_type": concept.get("statement_type")
-                })
+                }, self.ROOT_CONCEPT_PROJECTION)
             else:
                 root_concept = self.normalized_concepts_quarterly.find_one({
                     "path": root_path,
                     "company_cik": concept.get("company_cik"),
                     "statement_type": concept.get("statement_type")
-                })
+                }, self.ROOT_CONCEPT_PROJECTION)
         
-        if root_concept:
-            return root_concept.get("_id"), root_concept.get("concept")
-        
-        return None, None
+        root_info = (
+            (root_concept.get("_id"), root_concept.get("concept"))
+            if root_concept else (None, None)
+        )
+        self._set_cached(cache_key, root_info)
+        return root_info
     
     def _find_matching_annual_concept(
         self,
@@ -162,12 +350,17 @@ class FinancialDataRepository:
         5. Label-based matching as last resort
         """
         
-        # Find all matches by concept name
-        all_matches = list(self.normalized_concepts_annual.find({
-            "concept": concept_name,
-            "company_cik": company_cik,
-            "statement_type": statement_type
-        }))
+        # Find all matches by concept name (shared by every quarterly concept with
+        # this name, so memoized; the list is only read below, never mutated)
+        name_cache_key = ("annual_name_matches", concept_name, company_cik, statement_type)
+        all_matches = self._get_cached(name_cache_key)
+        if all_matches is _NOT_CACHED:
+            all_matches = list(self.normalized_concepts_annual.find({
+                "concept": concept_name,
+                "company_cik": company_cik,
+                "statement_type": statement_type
+            }, self.CONCEPT_MATCH_PROJECTION))
+            self._set_cached(name_cache_key, all_matches)
         
         # If no matches by name, try alternative matching strategies
         if not all_matches:
@@ -177,7 +370,7 @@ class FinancialDataRepository:
                     "concept": concept_name,
                     "company_cik": company_cik,
                     "statement_type": statement_type
-                })
+                }, self.CONCEPT_MATCH_PROJECTION)
             
             # FALLBACK 1: For segment/dimensional concepts with different names in annual
             # (e.g., quarterly: aapl:AmericasSegmentMember, annual: us-gaap:OperatingSegmentsMember)
@@ -193,7 +386,7 @@ class FinancialDataRepository:
                         "path": quarterly_path,
                         "statement_type": statement_type,
                         "label": quarterly_label
-                    })
+                    }, self.CONCEPT_MATCH_PROJECTION)
                     if annual_by_path_label:
                         return annual_by_path_label
                     
@@ -210,7 +403,7 @@ class FinancialDataRepository:
                             "path": {"$regex": path_prefix},
                             "statement_type": statement_type,
                             "label": quarterly_label
-                        })
+                        }, self.CONCEPT_MATCH_PROJECTION)
                         if annual_by_label_prefix:
                             return annual_by_label_prefix
             
@@ -228,7 +421,7 @@ class FinancialDataRepository:
                 "concept": concept_name,
                 "company_cik": company_cik,
                 "statement_type": statement_type
-            })
+            }, self.CONCEPT_MATCH_PROJECTION)
         
         if not quarterly_concept:
             return all_matches[0]  # Fallback to first match
@@ -259,10 +452,12 @@ class FinancialDataRepository:
                         break
                 return score
 
-            best_score = max(_path_proximity_score(c) for c in all_matches)
+            # Score each candidate once; the max and the filter both reuse the scores
+            scored_matches = [(_path_proximity_score(c), c) for c in all_matches]
+            best_score = max(score for score, _ in scored_matches)
             # Only act when path gives a real signal (score > 0)
             if best_score > 0:
-                closest = [c for c in all_matches if _path_proximity_score(c) == best_score]
+                closest = [c for score, c in scored_matches if score == best_score]
                 if len(closest) == 1:
                     return closest[0]
                 # Narrow all_matches to the closest group before further disambiguation
@@ -302,6 +497,71 @@ class FinancialDataRepository:
         # This is safer than returning first match which could be completely wrong
         return None
     
+    def _resolve_annual_concept(
+        self,
+        quarterly_concept: Dict[str, Any],
+        company_cik: str,
+        statement_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """Find the annual concept matching a quarterly concept (memoized by concept _id)."""
+        cache_key = ("annual_concept", quarterly_concept["_id"], company_cik, statement_type)
+        cached = self._get_cached(cache_key)
+        if cached is not _NOT_CACHED:
+            return cached
+        
+        # Get root parent concept information (traverse to top-level parent)
+        quarterly_root_parent_id, quarterly_root_parent_name = self._get_root_parent_concept_info(
+            quarterly_concept, "normalized_concepts_quarterly"
+        )
+        
+        # Find matching annual concept using root parent matching
+        annual_concept = self._find_matching_annual_concept(
+            quarterly_concept["concept"], company_cik, statement_type,
+            quarterly_root_parent_id, quarterly_root_parent_name,
+            quarterly_concept
+        )
+        
+        self._set_cached(cache_key, annual_concept)
+        return annual_concept
+    
+    def _resolve_concepts_by_name_and_path(
+        self,
+        concept_name: str,
+        concept_path: str,
+        company_cik: str,
+        statement_type: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Find the quarterly concept and its matching annual concept (memoized).
+        
+        Returns:
+            Tuple of (quarterly_concept, annual_concept)
+        """
+        cache_key = ("concepts_by_name_and_path", concept_name, concept_path, company_cik, statement_type)
+        cached = self._get_cached(cache_key)
+        if cached is not _NOT_CACHED:
+            return cached
+        
+        quarterly_concept = self._find_quarterly_concept(
+            company_cik, statement_type, concept_name, concept_path
+        )
+        
+        annual_concept = None
+        if quarterly_concept:
+            # Get root parent concept information (traverse to top-level parent)
+            quarterly_root_parent_id, quarterly_root_parent_name = self._get_root_parent_concept_info(
+                quarterly_concept, "normalized_concepts_quarterly"
+            )
+            
+            # Find matching annual concept using root parent matching
+            annual_concept = self._find_matching_annual_concept(
+                concept_name, company_cik, statement_type,
+                quarterly_root_parent_id, quarterly_root_parent_name,
+                quarterly_concept
+            )
+        
+        self._set_cached(cache_key, (quarterly_concept, annual_concept))
+        return quarterly_concept, annual_concept
+    
     def _map_quarterly_values(self, quarterly_data: QuarterlyData, values: List[Dict]) -> None:
         """Map quarterly values (Q1, Q2, Q3) to QuarterlyData object."""
         for q_value in values:
@@ -325,6 +585,8 @@ class FinancialDataRepository:
             "abstract": False
         }, {
             "_id": 1,
+            "company_cik": 1,
+            "statement_type": 1,
             "concept": 1,
             "path": 1,
             "order_key": 1,
@@ -357,9 +619,9 @@ class FinancialDataRepository:
         This is the unified method that handles all quarterly data retrieval.
         """
         
-        # Find quarterly concept
-        quarterly_concept = self._find_quarterly_concept(
-            company_cik, statement_type, concept_name, concept_path
+        # Find quarterly concept and its matching annual concept (root parent matching)
+        quarterly_concept, annual_concept = self._resolve_concepts_by_name_and_path(
+            concept_name, concept_path, company_cik, statement_type
         )
         
         if not quarterly_concept:
@@ -371,25 +633,13 @@ class FinancialDataRepository:
         
         quarterly_concept_id = quarterly_concept["_id"]
         
-        # Get root parent concept information (traverse to top-level parent)
-        quarterly_root_parent_id, quarterly_root_parent_name = self._get_root_parent_concept_info(
-            quarterly_concept, "normalized_concepts_quarterly"
-        )
-        
-        # Find matching annual concept using root parent matching
-        annual_concept = self._find_matching_annual_concept(
-            concept_name, company_cik, statement_type,
-            quarterly_root_parent_id, quarterly_root_parent_name,
-            quarterly_concept
-        )
-        
         # Get quarterly values (Q1, Q2, Q3)
         quarterly_values = list(self.concept_values_quarterly.find({
             "concept_id": quarterly_concept_id,
             "company_cik": company_cik,
             "reporting_period.fiscal_year": fiscal_year,
             "reporting_period.quarter": {"$in": [1, 2, 3]}
-        }))
+        }, self.QUARTERLY_VALUE_PROJECTION))
         
         # Get annual value if annual concept found
         annual_values = []
@@ -414,11 +664,11 @@ class FinancialDataRepository:
             is_exact_match = is_exact_name_match or is_exact_path_label_match
             
             if not is_dimensional or is_exact_match:
-                annual_values = list(self.concept_values_annual.find({
-                    "concept_id": annual_concept["_id"],
-                    "company_cik": company_cik,
-                    "reporting_period.fiscal_year": fiscal_year
-                }))
+                annual_record = self._get_annual_record(
+                    annual_concept["_id"], company_cik, fiscal_year
+                )
+                if annual_record:
+                    annual_values = [annual_record]
         
         # Initialize and populate quarterly data
         quarterly_data = QuarterlyData(
@@ -439,14 +689,23 @@ class FinancialDataRepository:
         concept_id: ObjectId,
         company_cik: str,
         fiscal_year: int,
-        statement_type: str
+        statement_type: str,
+        quarterly_concept: Optional[Dict[str, Any]] = None,
+        quarterly_values: Optional[List[Dict[str, Any]]] = None
     ) -> QuarterlyData:
         """Get quarterly data directly by concept_id.
         
         This is more reliable for dimensional concepts that share the same path.
+        Pass quarterly_concept when the caller already holds the concept document
+        (e.g. from get_statement_concepts) to skip re-fetching it, and
+        quarterly_values (one year's entry from get_quarterly_values_by_fiscal_year)
+        to skip the Q1-Q3 value query.
         """
         # Get quarterly concept
-        quarterly_concept = self.normalized_concepts_quarterly.find_one({"_id": concept_id})
+        if quarterly_concept is None:
+            quarterly_concept = self.normalized_concepts_quarterly.find_one(
+                {"_id": concept_id}, self.CONCEPT_MATCH_PROJECTION
+            )
         
         if not quarterly_concept:
             return QuarterlyData(
@@ -455,28 +714,19 @@ class FinancialDataRepository:
                 fiscal_year=fiscal_year
             )
         
-        # Get root parent concept information
-        quarterly_root_parent_id, quarterly_root_parent_name = self._get_root_parent_concept_info(
-            quarterly_concept, "normalized_concepts_quarterly"
-        )
-        
-        # Find matching annual concept
-        annual_concept = self._find_matching_annual_concept(
-            quarterly_concept["concept"],
-            company_cik,
-            statement_type,
-            quarterly_root_parent_id,
-            quarterly_root_parent_name,
-            quarterly_concept
+        # Find matching annual concept (via root parent information)
+        annual_concept = self._resolve_annual_concept(
+            quarterly_concept, company_cik, statement_type
         )
         
         # Get quarterly values (Q1, Q2, Q3)
-        quarterly_values = list(self.concept_values_quarterly.find({
-            "concept_id": concept_id,
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year,
-            "reporting_period.quarter": {"$in": [1, 2, 3]}
-        }))
+        if quarterly_values is None:
+            quarterly_values = list(self.concept_values_quarterly.find({
+                "concept_id": concept_id,
+                "company_cik": company_cik,
+                "reporting_period.fiscal_year": fiscal_year,
+                "reporting_period.quarter": {"$in": [1, 2, 3]}
+            }, self.QUARTERLY_VALUE_PROJECTION))
         
         # Get annual value if annual concept found
         annual_values = []
@@ -485,11 +735,11 @@ class FinancialDataRepository:
             is_exact_match = annual_concept.get("concept") == quarterly_concept["concept"]
             
             if not is_dimensional or is_exact_match:
-                annual_values = list(self.concept_values_annual.find({
-                    "concept_id": annual_concept["_id"],
-                    "company_cik": company_cik,
-                    "reporting_period.fiscal_year": fiscal_year
-                }))
+                annual_record = self._get_annual_record(
+                    annual_concept["_id"], company_cik, fiscal_year
+                )
+                if annual_record:
+                    annual_values = [annual_record]
         
         # Initialize and populate quarterly data
         quarterly_data = QuarterlyData(
@@ -505,6 +755,100 @@ class FinancialDataRepository:
         
         return quarterly_data
     
+    def get_annual_records_by_fiscal_year(
+        self,
+        annual_concept_id: ObjectId,
+        company_cik: str
+    ) -> Dict[int, Dict[str, Any]]:
+        """Get an annual concept's records for every fiscal year (memoized).
+        
+        The Q4 value and the Q4 record metadata both read the annual record of each
+        fiscal year; loading all years at once replaces two queries per year with one
+        per annual concept.
+        
+        Records without a fiscal year are skipped, as the per-year lookups never
+        matched them.
+        
+        Returns:
+            Dictionary of fiscal_year -> annual value document (ANNUAL_RECORD_PROJECTION
+            fields; first one found wins)
+        """
+        cache_key = ("annual_records", annual_concept_id, company_cik)
+        cached = self._get_cached(cache_key)
+        if cached is not _NOT_CACHED:
+            return cached
+        
+        records: Dict[int, Dict[str, Any]] = {}
+        for doc in self.concept_values_annual.find({
+            "concept_id": annual_concept_id,
+            "company_cik": company_cik
+        }, self.ANNUAL_RECORD_PROJECTION):
+            fiscal_year = (doc.get("reporting_period") or {}).get("fiscal_year")
+            if fiscal_year is not None:
+                records.setdefault(fiscal_year, doc)
+        
+        self._set_cached(cache_key, records)
+        return records
+    
+    def _get_annual_record(
+        self,
+        annual_concept_id: ObjectId,
+        company_cik: str,
+        fiscal_year: int
+    ) -> Optional[Dict[str, Any]]:
+        """Get an annual concept's record for one fiscal year, or None if there is none.
+        
+        Inside a lookup_cache_scope this reads from the memoized all-years prefetch;
+        otherwise it fetches just that year's record.
+        """
+        if self._lookup_cache is not None:
+            return self.get_annual_records_by_fiscal_year(
+                annual_concept_id, company_cik
+            ).get(fiscal_year)
+        
+        return self.concept_values_annual.find_one({
+            "concept_id": annual_concept_id,
+            "company_cik": company_cik,
+            "reporting_period.fiscal_year": fiscal_year
+        }, self.ANNUAL_RECORD_PROJECTION)
+    
+    def get_quarterly_values_by_fiscal_year(
+        self,
+        concept_id: ObjectId,
+        company_cik: str
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Get a concept's Q1-Q3 values for every fiscal year in one query.
+        
+        Values are bucketed by fiscal year on the server. Each entry has the same
+        shape as a QUARTERLY_VALUE_PROJECTION document, so it can be passed to
+        get_quarterly_data_by_concept_id as quarterly_values.
+        """
+        pipeline = [
+            {
+                "$match": {
+                    "concept_id": concept_id,
+                    "company_cik": company_cik,
+                    "reporting_period.quarter": {"$in": [1, 2, 3]}
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$reporting_period.fiscal_year",
+                    "values": {
+                        "$push": {
+                            "reporting_period": {"quarter": "$reporting_period.quarter"},
+                            "value": "$value"
+                        }
+                    }
+                }
+            }
+        ]
+        
+        return {
+            item["_id"]: item["values"]
+            for item in self.concept_values_quarterly.aggregate(pipeline)
+        }
+    
     # Compatibility aliases for existing code
     def get_quarterly_data_for_concept(
         self, 
@@ -514,7 +858,7 @@ class FinancialDataRepository:
     ) -> QuarterlyData:
         """Legacy method - Get quarterly data by concept_id."""
         # Get concept to find name and path
-        concept = self.normalized_concepts_quarterly.find_one({"_id": concept_id})
+        concept = self._get_concept_by_id(concept_id)
         if not concept:
             return QuarterlyData(concept_id=None, company_cik=company_cik, fiscal_year=fiscal_year)
         
@@ -576,7 +920,7 @@ class FinancialDataRepository:
             "company_cik": company_cik,
             "reporting_period.fiscal_year": fiscal_year,
             "reporting_period.quarter": 4
-        })
+        }, {"_id": 1})
         return existing_q4 is not None
     
     # Compatibility aliases
@@ -592,9 +936,28 @@ class FinancialDataRepository:
             "company_cik": company_cik,
             "reporting_period.fiscal_year": fiscal_year,
             "reporting_period.quarter": 4
-        })
+        }, {"_id": 1})
         return existing_q4 is not None
     
+    def get_existing_q4_keys(self, company_cik: str) -> Set[Tuple[ObjectId, int]]:
+        """Get (concept_id, fiscal_year) pairs that already have a Q4 value.
+        
+        One query per company replaces a check_q4_exists round-trip per
+        concept and fiscal year.
+        """
+        # The cursor is drained straight into the set, so fetch it in large batches
+        # rather than the driver's default 101-document first batch (Q4_KEY_INDEX
+        # covers it once ensure_indexes has run)
+        cursor = self.concept_values_quarterly.find({
+            "company_cik": company_cik,
+            "reporting_period.quarter": 4
+        }, {"_id": 0, "concept_id": 1, "reporting_period.fiscal_year": 1}).batch_size(1000)
+        
+        return {
+            (doc.get("concept_id"), doc.get("reporting_period", {}).get("fiscal_year"))
+            for doc in cursor
+        }
+    
     def check_q4_exists_by_name(
         self, 
         concept_name: str,
@@ -633,36 +996,16 @@ class FinancialDataRepository:
         
         This is the unified method for retrieving annual filing metadata.
         """
-        # Find quarterly concept
-        quarterly_concept = self._find_quarterly_concept(
-            company_cik, statement_type, concept_name, concept_path
+        # Find quarterly concept and its matching annual concept (root parent matching)
+        quarterly_concept, annual_concept = self._resolve_concepts_by_name_and_path(
+            concept_name, concept_path, company_cik, statement_type
         )
         
-        if not quarterly_concept:
-            return None
-        
-        # Get root parent concept information
-        quarterly_root_parent_id, quarterly_root_parent_name = self._get_root_parent_concept_info(
-            quarterly_concept, "normalized_concepts_quarterly"
-        )
-        
-        # Find matching annual concept using root parent matching
-        annual_concept = self._find_matching_annual_concept(
-            concept_name, company_cik, statement_type,
-            quarterly_root_parent_id, quarterly_root_parent_name,
-            quarterly_concept
-        )
-        
-        if not annual_concept:
+        if not quarterly_concept or not annual_concept:
             return None
         
         # Get annual record
-        annual_record = self.concept_values_annual.find_one({
-            "concept_id": annual_concept["_id"],
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year
-        })
-        return annual_record
+        return self._get_annual_record(annual_concept["_id"], company_cik, fiscal_year)
     
     # Compatibility aliases
     def get_annual_filing_metadata(
@@ -672,12 +1015,7 @@ class FinancialDataRepository:
         fiscal_year: int
     ) -> Optional[Dict[str, Any]]:
         """Legacy method - Get annual metadata by concept_id."""
-        annual_record = self.concept_values_annual.find_one({
-            "concept_id": concept_id,
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year
-        })
-        return annual_record
+        return self._get_annual_record(concept_id, company_cik, fiscal_year)
     
     def get_annual_filing_metadata_by_name(
         self, 
@@ -705,14 +1043,23 @@ class FinancialDataRepository:
     
     # ==================== UTILITY METHODS ====================
     
+    def _get_concept_by_id(
+        self,
+        concept_id: ObjectId,
+        collection_name: str = "normalized_concepts_quarterly"
+    ) -> Optional[Dict[str, Any]]:
+        """Get a concept document by _id (CONCEPT_MATCH_PROJECTION fields)."""
+        return getattr(self.db, collection_name).find_one(
+            {"_id": concept_id}, self.CONCEPT_MATCH_PROJECTION
+        )
+    
     def get_root_parent_concept_name(
         self, 
         concept_id: ObjectId, 
         collection_name: str = "normalized_concepts_quarterly"
     ) -> Optional[str]:
         """Get the root parent concept name for a given concept."""
-        collection = getattr(self.db, collection_name)
-        concept = collection.find_one({"_id": concept_id})
+        concept = self._get_concept_by_id(concept_id, collection_name)
         
         if not concept:
             return None
@@ -727,18 +1074,42 @@ class FinancialDataRepository:
         target_collection: str,
         company_cik: str
     ) -> Optional[Dict[str, Any]]:
-        """Find a matching concept in target collection based on parent concept relationship."""
+        """Find a matching concept in target collection based on parent concept relationship.
+        
+        Memoized inside a lookup_cache_scope: the match doesn't depend on the fiscal
+        year, so a company pass looks it up once per concept.
+        """
+        cache_key = ("parent_match", concept_name, source_concept_id, target_collection, company_cik)
+        cached = self._get_cached(cache_key)
+        if cached is not _NOT_CACHED:
+            return cached
+        
+        target_concept = self._query_matching_concept_by_parent(
+            concept_name, source_concept_id, target_collection, company_cik
+        )
+        self._set_cached(cache_key, target_concept)
+        return target_concept
+    
+    def _query_matching_concept_by_parent(
+        self,
+        concept_name: str,
+        source_concept_id: ObjectId,
+        target_collection: str,
+        company_cik: str
+    ) -> Optional[Dict[str, Any]]:
+        """Run the parent-relationship match behind find_matching_concept_by_parent."""
         source_collection_name = "normalized_concepts_quarterly" if target_collection == "normalized_concepts_annual" else "normalized_concepts_quarterly"
-        source_collection = getattr(self.db, source_collection_name)
         target_collection_obj = getattr(self.db, target_collection)
         
         # Get the source concept
-        source_concept = source_collection.find_one({"_id": source_concept_id})
+        source_concept = self._get_concept_by_id(source_concept_id, source_collection_name)
         if not source_concept:
             return None
         
-        # Get parent concept name
-        parent_concept_name = self.get_root_parent_concept_name(source_concept_id, source_collection_name)
+        # Get parent concept name (from the document already in hand, not a refetch)
+        _, parent_concept_name = self._get_root_parent_concept_info(
+            source_concept, source_collection_name
+        )
         if not parent_concept_name:
             return None
         
@@ -747,22 +1118,23 @@ class FinancialDataRepository:
             "concept": concept_name,
             "company_cik": company_cik,
             "statement_type": "income_statement"
-        })
+        }, self.CONCEPT_MATCH_PROJECTION)
         
         if target_concept:
             return target_concept
         
         # If source is dimensional, look for dimensional concepts in target with same parent
         if source_concept.get("dimension_concept"):
-            dimensional_concepts = list(target_collection_obj.find({
+            # Iterate the cursor directly - the first parent match returns early
+            dimensional_concepts = target_collection_obj.find({
                 "concept": concept_name,
                 "company_cik": company_cik,
                 "statement_type": "income_statement",
                 "dimension_concept": True
-            }))
+            }, self.CONCEPT_MATCH_PROJECTION)
             
             for dim_concept in dimensional_concepts:
-                target_parent_name = self.get_root_parent_concept_name(dim_concept["_id"], target_collection)
+                _, target_parent_name = self._get_root_parent_concept_info(dim_concept, target_collection)
                 if target_parent_name == parent_concept_name:
                     return dim_concept
         
@@ -793,6 +1165,8 @@ class FinancialDataRepository:
             "statement_type": {"$in": ["income_statement", "cash_flows"]}
         }
         
+        # With a CIK this walks only the company's Q4 range of Q4_KEY_INDEX (the only
+        # index led by company_cik + quarter). Not hinted: delete hints need 4.4+
         if company_cik:
             query["company_cik"] = company_cik
         
@@ -805,14 +1179,20 @@ class FinancialDataRepository:
     
     def get_fiscal_years_for_company(self, company_cik: str) -> List[int]:
         """Get all fiscal years available for a company."""
+        # Records without a fiscal year are dropped in $match rather than after grouping
         pipeline = [
-            {"$match": {"company_cik": company_cik}},
+            {
+                "$match": {
+                    "company_cik": company_cik,
+                    "reporting_period.fiscal_year": {"$ne": None}
+                }
+            },
             {"$group": {"_id": "$reporting_period.fiscal_year"}},
             {"$sort": {"_id": 1}}
         ]
         
-        result = list(self.concept_values_annual.aggregate(pipeline))
-        return [item["_id"] for item in result if item["_id"] is not None]
+        cursor = self.concept_values_annual.aggregate(pipeline)
+        return [item["_id"] for item in cursor]
     
     def get_fiscal_years_for_quarterly_cashflow(self, company_cik: str) -> List[int]:
         """Get all fiscal years with quarterly cash flow data for a company.
@@ -825,15 +1205,57 @@ class FinancialDataRepository:
                 "$match": {
                     "company_cik": company_cik,
                     "statement_type": "cash_flows",
-                    "form_type": "10-Q"
+                    "form_type": "10-Q",
+                    "reporting_period.fiscal_year": {"$ne": None}
                 }
             },
             {"$group": {"_id": "$reporting_period.fiscal_year"}},
             {"$sort": {"_id": 1}}
         ]
         
-        result = list(self.concept_values_quarterly.aggregate(pipeline))
-        return [item["_id"] for item in result if item["_id"] is not None]
+        cursor = self.concept_values_quarterly.aggregate(pipeline)
+        return [item["_id"] for item in cursor]
+    
+    def get_fiscal_years_for_quarterly_cashflow_by_company(self) -> Dict[str, List[int]]:
+        """Get fiscal years with quarterly cash flow data for every company in one pass.
+        
+        Same fiscal years as get_fiscal_years_for_quarterly_cashflow, keyed by CIK,
+        limited to companies that have at least one Q1-Q3 cash flow value.
+        """
+        pipeline = [
+            {
+                "$match": {
+                    "statement_type": "cash_flows",
+                    "form_type": "10-Q"
+                }
+            },
+            # Keep only the grouped fields so the $group stage works on small documents
+            {
+                "$project": {
+                    "_id": 0,
+                    "company_cik": 1,
+                    "reporting_period.fiscal_year": 1,
+                    "reporting_period.quarter": 1
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$company_cik",
+                    "fiscal_years": {"$addToSet": "$reporting_period.fiscal_year"},
+                    "has_q1_q3": {
+                        "$max": {"$in": ["$reporting_period.quarter", [1, 2, 3]]}
+                    }
+                }
+            },
+            {"$match": {"has_q1_q3": True}},
+            {"$sort": {"_id": 1}}
+        ]
+        
+        return {
+            item["_id"]: sorted(fy for fy in item["fiscal_years"] if fy is not None)
+            for item in self.concept_values_quarterly.aggregate(pipeline, allowDiskUse=True)
+            if item["_id"]
+        }
     
     def _concept_value_to_dict(self, concept_value: ConceptValue) -> Dict[str, Any]:
         """Convert ConceptValue dataclass to dictionary for MongoDB insertion."""
@@ -40,15 +40,18 @@ class CashflowFixedMigration:
                 "$match": {
                     "statement_type": "cash_flows",
                     "form_type": "10-Q",
-                    "reporting_period.quarter": {"$in": [2, 3]}
+                    "reporting_period.quarter": {"$in": [2, 3]},
+                    "company_cik": {"$nin": [None, ""]}
                 }
             },
             {"$group": {"_id": "$company_cik"}},
             {"$sort": {"_id": 1}}
         ]
         
-        result = list(self.concept_values_quarterly.aggregate(pipeline))
-        return [item["_id"] for item in result if item["_id"]]
+        # The $match drops missing/empty CIKs before grouping; the truthiness check
+        # still drops any other falsy CIK (e.g. 0) as before
+        cursor = self.concept_values_quarterly.aggregate(pipeline)
+        return [item["_id"] for item in cursor if item["_id"]]
     
     def get_unfixed_q2_q3_count(self, company_cik: Optional[str] = None) -> Dict[str, int]:
         """Get count of Q2/Q3 records without cashflow_fixed flag."""
@@ -72,9 +75,8 @@ class CashflowFixedMigration:
             }
         ]
         
-        result = list(self.concept_values_quarterly.aggregate(pipeline))
         counts = {"q2": 0, "q3": 0}
-        for item in result:
+        for item in self.concept_values_quarterly.aggregate(pipeline):
             if item["_id"] == 2:
                 counts["q2"] = item["count"]
             elif item["_id"] == 3:
@@ -106,31 +108,32 @@ class CashflowFixedMigration:
             "company_cik": company_cik or "all"
         }
         
-        # Build query for Q2 records without cashflow_fixed
-        q2_query = {
-            "statement_type": "cash_flows",
-            "form_type": "10-Q",
-            "reporting_period.quarter": 2,
-            "cashflow_fixed": {"$ne": True}
-        }
-        
-        # Build query for Q3 records without cashflow_fixed
-        q3_query = {
-            "statement_type": "cash_flows",
-            "form_type": "10-Q",
-            "reporting_period.quarter": 3,
-            "cashflow_fixed": {"$ne": True}
-        }
-        
-        if company_cik:
-            q2_query["company_cik"] = company_cik
-            q3_query["company_cik"] = company_cik
-        
         if dry_run:
-            # Just count the records
-            results["q2_marked"] = self.concept_values_quarterly.count_documents(q2_query)
-            results["q3_marked"] = self.concept_values_quarterly.count_documents(q3_query)
+            # Just count the records (Q2 and Q3 in a single grouped aggregation)
+            counts = self.get_unfixed_q2_q3_count(company_cik)
+            results["q2_marked"] = counts["q2"]
+            results["q3_marked"] = counts["q3"]
         else:
+            # Build query for Q2 records without cashflow_fixed
+            q2_query = {
+                "statement_type": "cash_flows",
+                "form_type": "10-Q",
+                "reporting_period.quarter": 2,
+                "cashflow_fixed": {"$ne": True}
+            }
+            
+            # Build query for Q3 records without cashflow_fixed
+            q3_query = {
+                "statement_type": "cash_flows",
+                "form_type": "10-Q",
+                "reporting_period.quarter": 3,
+                "cashflow_fixed": {"$ne": True}
+            }
+            
+            if company_cik:
+                q2_query["company_cik"] = company_cik
+                q3_query["company_cik"] = company_cik
+            
             # Actually update the records
             migration_timestamp = datetime.utcnow()
             
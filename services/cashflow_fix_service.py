@@ -9,12 +9,14 @@ Incremental Processing:
 - Use `force=True` to re-fix all records regardless of status
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 try:
     from bson import ObjectId
+    from pymongo import UpdateOne
     from pymongo.database import Database
+    from pymongo.errors import BulkWriteError
     from pymongo.collection import Collection
 except ImportError:
     print("PyMongo not installed. Please run: pip install pymongo")
@@ -26,6 +28,16 @@ from repositories.financial_repository import FinancialDataRepository
 class CashFlowFixService:
     """Service for fixing cumulative cash flow values in Q2 and Q3."""
     
+    # Fields read from the Q1-Q3 value documents
+    VALUE_PROJECTION = {
+        "_id": 1,
+        "concept_id": 1,
+        "reporting_period.quarter": 1,
+        "value": 1,
+        "cashflow_fixed": 1,
+        "original_cumulative_value": 1
+    }
+    
     def __init__(self, repository: FinancialDataRepository, verbose: bool = False, force: bool = False):
         self.repository = repository
         self.verbose = verbose
@@ -36,7 +48,8 @@ class CashFlowFixService:
         self, 
         company_cik: str, 
         fiscal_year: Optional[int] = None,
-        quarter: Optional[int] = None
+        quarter: Optional[int] = None,
+        fiscal_years: Optional[List[int]] = None
     ) -> Dict[str, Any]:
         """Fix cumulative cash flow values for a specific company.
         
@@ -44,6 +57,8 @@ class CashFlowFixService:
             company_cik: Company CIK to process
             fiscal_year: Optional specific fiscal year to fix. If None, fixes all years.
             quarter: Optional specific quarter to fix (2 or 3). If None, fixes both Q2 and Q3.
+            fiscal_years: Optional pre-fetched list of all fiscal years for the company
+                (used by fix_all_companies to avoid a lookup per company)
             
         Returns:
             Dictionary with statistics about the fix operation
@@ -73,7 +88,8 @@ class CashFlowFixService:
             else:
                 # Use quarterly cash flow specific method to get ALL years with quarterly data
                 # This includes current/incomplete fiscal years
-                fiscal_years = self.repository.get_fiscal_years_for_quarterly_cashflow(company_cik)
+                if fiscal_years is None:
+                    fiscal_years = self.repository.get_fiscal_years_for_quarterly_cashflow(company_cik)
                 if self.verbose:
                     print(f"\nProcessing company {company_cik}: {len(fiscal_years)} fiscal years found")
             
@@ -133,18 +149,30 @@ class CashFlowFixService:
             force_info = " [FORCE MODE]" if self.force else ""
             print(f"  Processing FY{fiscal_year}{quarter_info}{force_info}...")
         
-        # Get all cash flow concepts for Q1, Q2, and Q3
-        q1_values = self._get_quarterly_values(company_cik, fiscal_year, 1)
-        q2_values = self._get_quarterly_values(company_cik, fiscal_year, 2)
-        q3_values = self._get_quarterly_values(company_cik, fiscal_year, 3)
+        # Get all cash flow concepts for Q1, Q2, and Q3 (one query for all three)
+        values_by_quarter = self._get_quarterly_values(company_cik, fiscal_year)
+        q1_values = values_by_quarter[1]
+        q2_values = values_by_quarter[2]
+        q3_values = values_by_quarter[3]
         
         # Create lookup dictionaries by concept_id
         q1_lookup = {str(val["concept_id"]): val for val in q1_values}
         q2_lookup = {str(val["concept_id"]): val for val in q2_values}
         q3_lookup = {str(val["concept_id"]): val for val in q3_values}
         
+        # Concept names are only needed for verbose output; resolve them in one query
+        concept_names: Dict[ObjectId, str] = {}
         if self.verbose:
             print(f"    Found Q1: {len(q1_values)}, Q2: {len(q2_values)}, Q3: {len(q3_values)} values")
+            concept_names = self._get_concept_names(
+                [val["concept_id"] for val in q2_values + q3_values]
+            )
+        
+        # Updates are collected per quarter as (operation, concept_id, verbose message)
+        # and written with one bulk_write per quarter instead of one round-trip per value
+        q2_updates: List[Tuple[UpdateOne, str, str]] = []
+        q3_updates: List[Tuple[UpdateOne, str, str]] = []
+        fixed_at = datetime.utcnow()
         
         # Fix Q2 values (Q2_actual = Q2_cumulative - Q1)
         if target_quarter is None or target_quarter == 2:
@@ -153,7 +181,7 @@ class CashFlowFixService:
                 if q2_value.get("cashflow_fixed") and not self.force:
                     results["q2_already_fixed"] += 1
                     if self.verbose:
-                        concept_name = self._get_concept_name(q2_value["concept_id"])
+                        concept_name = concept_names.get(q2_value["concept_id"], "Unknown")
                         print(f"    ⏩ Already fixed Q2 for {concept_name}: skipping")
                     continue
                 
@@ -165,33 +193,27 @@ class CashFlowFixService:
                     q1_actual = q1_value["value"]
                     q2_actual = q2_cumulative - q1_actual
                     
-                    # Update Q2 value in database with cashflow_fixed flag
-                    try:
-                        self.concept_values_quarterly.update_one(
-                            {"_id": q2_value["_id"]},
-                            {
-                                "$set": {
-                                    "value": q2_actual,
-                                    "cashflow_fixed": True,
-                                    "cashflow_fixed_at": datetime.utcnow(),
-                                    "original_cumulative_value": q2_cumulative
-                                }
+                    # Queue the Q2 update with the cashflow_fixed flag (counted and
+                    # reported once the write has gone through)
+                    message = ""
+                    if self.verbose:
+                        concept_name = concept_names.get(q2_value["concept_id"], "Unknown")
+                        message = f"    ✓ Fixed Q2 for {concept_name}: {q2_cumulative:,.2f} → {q2_actual:,.2f} (Q2 - Q1)"
+                    q2_updates.append((UpdateOne(
+                        {"_id": q2_value["_id"]},
+                        {
+                            "$set": {
+                                "value": q2_actual,
+                                "cashflow_fixed": True,
+                                "cashflow_fixed_at": fixed_at,
+                                "original_cumulative_value": q2_cumulative
                             }
-                        )
-                        results["q2_fixed"] += 1
-                        
-                        if self.verbose:
-                            concept_name = self._get_concept_name(q2_value["concept_id"])
-                            print(f"    ✓ Fixed Q2 for {concept_name}: {q2_cumulative:,.2f} → {q2_actual:,.2f} (Q2 - Q1)")
-                    
-                    except Exception as e:
-                        results["errors"].append(
-                            f"Error updating Q2 value for concept_id {concept_id_str}: {str(e)}"
-                        )
+                        }
+                    ), concept_id_str, message))
                 else:
                     results["q2_skipped"] += 1
                     if self.verbose:
-                        concept_name = self._get_concept_name(q2_value["concept_id"])
+                        concept_name = concept_names.get(q2_value["concept_id"], "Unknown")
                         print(f"    ⏭️  Skipped Q2 for {concept_name}: No Q1 value found")
         
         # Fix Q3 values (Q3_actual = Q3_cumulative - Q2_cumulative)
@@ -202,7 +224,7 @@ class CashFlowFixService:
                 if q3_value.get("cashflow_fixed") and not self.force:
                     results["q3_already_fixed"] += 1
                     if self.verbose:
-                        concept_name = self._get_concept_name(q3_value["concept_id"])
+                        concept_name = concept_names.get(q3_value["concept_id"], "Unknown")
                         print(f"    ⏩ Already fixed Q3 for {concept_name}: skipping")
                     continue
                 
@@ -215,78 +237,123 @@ class CashFlowFixService:
                     q2_cumulative = q2_value.get("original_cumulative_value", q2_value["value"])
                     q3_actual = q3_cumulative - q2_cumulative
                     
-                    # Update Q3 value in database with cashflow_fixed flag
-                    try:
-                        self.concept_values_quarterly.update_one(
-                            {"_id": q3_value["_id"]},
-                            {
-                                "$set": {
-                                    "value": q3_actual,
-                                    "cashflow_fixed": True,
-                                    "cashflow_fixed_at": datetime.utcnow(),
-                                    "original_cumulative_value": q3_cumulative
-                                }
+                    # Queue the Q3 update with the cashflow_fixed flag (counted and
+                    # reported once the write has gone through)
+                    message = ""
+                    if self.verbose:
+                        concept_name = concept_names.get(q3_value["concept_id"], "Unknown")
+                        message = f"    ✓ Fixed Q3 for {concept_name}: {q3_cumulative:,.2f} → {q3_actual:,.2f} (Q3 - Q2)"
+                    q3_updates.append((UpdateOne(
+                        {"_id": q3_value["_id"]},
+                        {
+                            "$set": {
+                                "value": q3_actual,
+                                "cashflow_fixed": True,
+                                "cashflow_fixed_at": fixed_at,
+                                "original_cumulative_value": q3_cumulative
                             }
-                        )
-                        results["q3_fixed"] += 1
-                        
-                        if self.verbose:
-                            concept_name = self._get_concept_name(q3_value["concept_id"])
-                            print(f"    ✓ Fixed Q3 for {concept_name}: {q3_cumulative:,.2f} → {q3_actual:,.2f} (Q3 - Q2)")
-                    
-                    except Exception as e:
-                        results["errors"].append(
-                            f"Error updating Q3 value for concept_id {concept_id_str}: {str(e)}"
-                        )
+                        }
+                    ), concept_id_str, message))
                 else:
                     results["q3_skipped"] += 1
                     if self.verbose:
-                        concept_name = self._get_concept_name(q3_value["concept_id"])
+                        concept_name = concept_names.get(q3_value["concept_id"], "Unknown")
                         print(f"    ⏭️  Skipped Q3 for {concept_name}: No Q2 value found")
         
+        self._write_quarter_updates(2, q2_updates, results)
+        self._write_quarter_updates(3, q3_updates, results)
+        
         return results
     
+    def _write_quarter_updates(
+        self,
+        quarter: int,
+        updates: List[Tuple[UpdateOne, str, str]],
+        results: Dict[str, Any]
+    ) -> None:
+        """Write one quarter's queued fixes in a single unordered bulk_write.
+        
+        q{quarter}_fixed is taken from the server's modified count, and the verbose
+        "Fixed" lines are printed only for updates that were applied.
+        
+        Args:
+            quarter: Quarter being fixed (2 or 3)
+            updates: Queued (operation, concept_id, verbose message) tuples
+            results: Per-fiscal-year results to update
+        """
+        if not updates:
+            return
+        
+        failed_indexes = set()
+        try:
+            write_result = self.concept_values_quarterly.bulk_write(
+                [operation for operation, _, _ in updates], ordered=False
+            )
+            results[f"q{quarter}_fixed"] += write_result.modified_count
+        except BulkWriteError as e:
+            # Unordered writes still apply the rest; only the listed ones failed
+            results[f"q{quarter}_fixed"] += e.details.get("nModified", 0)
+            for write_error in e.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                _, concept_id_str, _ = updates[write_error["index"]]
+                results["errors"].append(
+                    f"Error updating Q{quarter} value for concept_id {concept_id_str}: {write_error.get('errmsg')}"
+                )
+        except Exception as e:
+            # The batch may have been partially applied (e.g. a network error midway),
+            # so its outcome is unknown rather than failed
+            results["errors"].append(
+                f"Q{quarter} batch of {len(updates)} updates in unknown state (possibly partially applied): {str(e)}"
+            )
+            return
+        
+        if self.verbose:
+            for index, (_, _, message) in enumerate(updates):
+                if index not in failed_indexes:
+                    print(message)
+    
     def _get_quarterly_values(
         self, 
         company_cik: str, 
-        fiscal_year: int, 
-        quarter: int
-    ) -> List[Dict[str, Any]]:
-        """Get all cash flow values for a specific quarter.
+        fiscal_year: int
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Get all cash flow values for Q1, Q2 and Q3 of a fiscal year.
         
         Args:
             company_cik: Company CIK
             fiscal_year: Fiscal year
-            quarter: Quarter number (1, 2, or 3)
             
         Returns:
-            List of value documents
+            Dictionary mapping quarter (1, 2, 3) to its list of value documents
         """
-        return list(self.concept_values_quarterly.find({
+        values_by_quarter: Dict[int, List[Dict[str, Any]]] = {1: [], 2: [], 3: []}
+        for doc in self.concept_values_quarterly.find({
             "company_cik": company_cik,
             "statement_type": "cash_flows",
             "reporting_period.fiscal_year": fiscal_year,
-            "reporting_period.quarter": quarter,
+            "reporting_period.quarter": {"$in": [1, 2, 3]},
             "form_type": "10-Q"
-        }))
+        }, self.VALUE_PROJECTION):
+            values_by_quarter[doc["reporting_period"]["quarter"]].append(doc)
+        return values_by_quarter
     
-    def _get_concept_name(self, concept_id: ObjectId) -> str:
-        """Get concept name from concept_id.
+    def _get_concept_names(self, concept_ids: List[ObjectId]) -> Dict[ObjectId, str]:
+        """Get concept names for a batch of concept_ids in a single query.
         
         Args:
-            concept_id: Concept ObjectId
+            concept_ids: Concept ObjectIds
             
         Returns:
-            Concept name or 'Unknown'
+            Dictionary mapping concept_id to concept name (missing ids are omitted)
         """
         try:
-            concept = self.repository.normalized_concepts_quarterly.find_one(
-                {"_id": concept_id},
+            cursor = self.repository.normalized_concepts_quarterly.find(
+                {"_id": {"$in": list(set(concept_ids))}},
                 {"concept": 1}
             )
-            return concept.get("concept", "Unknown") if concept else "Unknown"
+            return {doc["_id"]: doc.get("concept", "Unknown") for doc in cursor}
         except Exception:
-            return "Unknown"
+            return {}
     
     def fix_all_companies(self) -> Dict[str, Any]:
         """Fix cumulative cash flow values for all companies.
@@ -308,8 +375,9 @@ class CashFlowFixService:
         }
         
         try:
-            # Get all unique companies with cash flow data
-            companies = self._get_all_cashflow_companies()
+            # Get all companies with cash flow data and their fiscal years in one query
+            fiscal_years_by_company = self._get_all_cashflow_companies()
+            companies = list(fiscal_years_by_company)
             overall_results["total_companies"] = len(companies)
             
             if not companies:
@@ -325,7 +393,9 @@ class CashFlowFixService:
                 try:
                     print(f"\n[{idx}/{len(companies)}] Processing {company_cik}...")
                     
-                    company_result = self.fix_cumulative_values_for_company(company_cik)
+                    company_result = self.fix_cumulative_values_for_company(
+                        company_cik, fiscal_years=fiscal_years_by_company[company_cik]
+                    )
                     overall_results["companies_processed"] += 1
                     overall_results["total_q2_fixed"] += company_result["q2_fixed"]
                     overall_results["total_q3_fixed"] += company_result["q3_fixed"]
@@ -351,28 +421,15 @@ class CashFlowFixService:
         
         return overall_results
     
-    def _get_all_cashflow_companies(self) -> List[str]:
+    def _get_all_cashflow_companies(self) -> Dict[str, List[int]]:
         """Get all unique company CIKs that have cash flow data.
         
         Returns:
-            List of company CIKs
+            Dictionary mapping company CIK (sorted) to its fiscal years
         """
         try:
-            pipeline = [
-                {
-                    "$match": {
-                        "statement_type": "cash_flows",
-                        "form_type": "10-Q",
-                        "reporting_period.quarter": {"$in": [1, 2, 3]}
-                    }
-                },
-                {"$group": {"_id": "$company_cik"}},
-                {"$sort": {"_id": 1}}
-            ]
-            
-            result = list(self.concept_values_quarterly.aggregate(pipeline))
-            return [item["_id"] for item in result if item["_id"]]
+            return self.repository.get_fiscal_years_for_quarterly_cashflow_by_company()
         
         except Exception as e:
             print(f"Error getting companies list: {e}")
-            return []
+            return {}
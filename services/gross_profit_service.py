@@ -34,6 +34,15 @@ class GrossProfitService:
     REVENUE_LABEL = "Total Revenues"
     COST_LABEL = "Cost of Revenues"
     
+    # Fields read from revenue/cost/gross profit value documents
+    VALUE_PROJECTION = {
+        "_id": 1,
+        "concept_id": 1,
+        "form_type": 1,
+        "reporting_period": 1,
+        "value": 1
+    }
+    
     def __init__(self, repository: FinancialDataRepository, verbose: bool = False):
         self.repository = repository
         self.verbose = verbose
@@ -51,6 +60,9 @@ class GrossProfitService:
         self.standardlabels: Collection = self.db.get_collection("standardlabels")
         self.concepts_standard_mapping: Collection = self.db.get_collection("concepts_standard_mapping")
         self.us_gaap_taxonomy: Collection = self.db.get_collection("us_gaap_taxonomy")
+        
+        # Standard label -> taxonomy concept resolution, shared across companies
+        self._standard_label_cache: Dict[str, Optional[Dict[str, Any]]] = {}
     
     def calculate_gross_profit_for_company(
         self, 
@@ -143,6 +155,33 @@ class GrossProfitService:
             if self.verbose:
                 print(f"✓ Found {len(fiscal_years)} fiscal years to process")
             
+            # Quarterly inputs for every fiscal year, bucketed by year on the server
+            quarterly_values_by_year = None
+            if has_quarterly:
+                quarterly_values_by_year = self._get_quarterly_values_by_year(
+                    company_cik,
+                    [
+                        gross_profit_quarterly_concept["concept"]["_id"],
+                        revenue_quarterly_concept["_id"],
+                        cost_quarterly_concept["_id"]
+                    ]
+                )
+            
+            # The annual concept lookup doesn't depend on the fiscal year, and the
+            # annual values for every year can come back in one query
+            resolved_annual_concepts = None
+            annual_values = None
+            if has_annual:
+                resolved_annual_concepts = self._resolve_annual_concepts(
+                    company_cik, revenue_annual_concept, cost_annual_concept
+                )
+                annual_concept_ids = [gross_profit_annual_concept["concept"]["_id"]] + [
+                    concept["_id"] for concept in resolved_annual_concepts if concept
+                ]
+                annual_values = self._get_annual_values_for_years(
+                    company_cik, fiscal_years, annual_concept_ids
+                )
+            
             # Step 4: Process each fiscal year
             for fiscal_year in fiscal_years:
                 try:
@@ -155,7 +194,13 @@ class GrossProfitService:
                         cost_annual_concept,
                         gross_profit_quarterly_concept["concept"],
                         gross_profit_annual_concept["concept"],
-                        recalculate
+                        recalculate,
+                        resolved_annual_concepts=resolved_annual_concepts,
+                        annual_values=annual_values,
+                        quarterly_values=(
+                            quarterly_values_by_year.get(fiscal_year, {})
+                            if quarterly_values_by_year is not None else None
+                        )
                     )
                     
                     results["fiscal_years_processed"] += 1
@@ -265,7 +310,7 @@ class GrossProfitService:
             "concept": self.GROSS_PROFIT_CONCEPT,
             "statement_type": self.STATEMENT_TYPE,
             "path": self.GROSS_PROFIT_PATH
-        })
+        }, self.repository.CONCEPT_MATCH_PROJECTION)
         
         if existing_concept:
             # Concept already exists - use it, don't create new one
@@ -342,6 +387,61 @@ class GrossProfitService:
         
         return revenue_quarterly_concept, cost_quarterly_concept, revenue_annual_concept, cost_annual_concept
     
+    def _get_standard_label_mapping(self, label: str) -> Optional[Dict[str, Any]]:
+        """Get a standard label with its concept mapping and taxonomy concepts.
+        
+        The result is the same for every company, so it is cached per label for the
+        lifetime of the service.
+        
+        Returns:
+            The standardlabels document with "mapping" (concepts_standard_mapping) and
+            "taxonomy" (matching us_gaap_taxonomy concepts), or None if not found
+        """
+        if label in self._standard_label_cache:
+            return self._standard_label_cache[label]
+        
+        # Steps 1-3 in one round-trip: standardlabels -> concepts_standard_mapping
+        # -> us_gaap_taxonomy joined server-side with $lookup
+        pipeline = [
+            {
+                "$match": {
+                    "standard_label": label,
+                    "statement_type": self.STATEMENT_TYPE
+                }
+            },
+            {"$limit": 1},
+            {
+                "$lookup": {
+                    "from": "concepts_standard_mapping",
+                    "localField": "_id",
+                    "foreignField": "standard_label_id",
+                    "as": "mappings"
+                }
+            },
+            {"$project": {"mapping": {"$arrayElemAt": ["$mappings", 0]}}},
+            # Trim the selected mapping to what is read below so the rest of the joined
+            # mapping document isn't carried through the taxonomy $lookup
+            {"$project": {"mapping._id": 1, "mapping.concept_ids": 1}},
+            {
+                "$lookup": {
+                    "from": "us_gaap_taxonomy",
+                    "localField": "mapping.concept_ids",
+                    "foreignField": "_id",
+                    "as": "taxonomy"
+                }
+            },
+            {
+                "$project": {
+                    "mapping.concept_ids": 1,
+                    "taxonomy._id": 1,
+                    "taxonomy.concept": 1
+                }
+            }
+        ]
+        standard_label = next(self.standardlabels.aggregate(pipeline), None)
+        self._standard_label_cache[label] = standard_label
+        return standard_label
+    
     def _find_concept_via_standard_flow(
         self,
         label: str,
@@ -368,11 +468,10 @@ class GrossProfitService:
         collection_name = "annual" if is_annual else "quarterly"
         
         try:
+            # Steps 1-3 don't depend on the company; resolved once per label
+            standard_label = self._get_standard_label_mapping(label)
+            
             # Step 1: Look up label in standardlabels collection
-            standard_label = self.standardlabels.find_one({
-                "standard_label": label,
-                "statement_type": self.STATEMENT_TYPE
-            })
             if not standard_label:
                 if self.verbose:
                     print(f"  ⚠️  Label '{label}' not found in standardlabels collection")
@@ -383,9 +482,7 @@ class GrossProfitService:
                 print(f"  → Found standard label '{label}' with id: {standard_label_id}")
             
             # Step 2: Look up in concepts_standard_mapping to get concept_ids
-            mapping = self.concepts_standard_mapping.find_one({
-                "standard_label_id": standard_label_id
-            })
+            mapping = standard_label.get("mapping")
             if not mapping:
                 if self.verbose:
                     print(f"  ⚠️  No mapping found for label id: {standard_label_id}")
@@ -401,25 +498,34 @@ class GrossProfitService:
                 print(f"  → Found {len(concept_ids)} concept_ids in mapping")
             
             # Step 3: Look up in us_gaap_taxonomy to get concept names
-            # Try each concept_id until we find one that exists for this company
-            for concept_id in concept_ids:
-                taxonomy = self.us_gaap_taxonomy.find_one({"_id": concept_id})
-                if not taxonomy:
-                    continue
-                
-                concept_name = taxonomy.get("concept")
-                if not concept_name:
-                    continue
-                
+            # ($lookup output is unordered; restore the mapping order)
+            taxonomy_names = {
+                doc["_id"]: doc.get("concept")
+                for doc in standard_label.get("taxonomy", [])
+            }
+            concept_names = [
+                taxonomy_names[concept_id]
+                for concept_id in concept_ids
+                if taxonomy_names.get(concept_id)
+            ]
+            
+            # Step 4: Look up all candidate names in the specified normalized_concepts
+            # collection at once, keeping the first document per name
+            normalized_concepts: Dict[str, Dict[str, Any]] = {}
+            if concept_names:
+                for doc in collection.find({
+                    "concept": {"$in": concept_names},
+                    "company_cik": company_cik,
+                    "statement_type": self.STATEMENT_TYPE
+                }, self.repository.CONCEPT_MATCH_PROJECTION):
+                    normalized_concepts.setdefault(doc["concept"], doc)
+            
+            # Try each concept in mapping order until we find one that exists for this company
+            for concept_name in concept_names:
                 if self.verbose:
                     print(f"  → Found concept in taxonomy: {concept_name}")
                 
-                # Step 4: Look up in the specified normalized_concepts collection
-                normalized_concept = collection.find_one({
-                    "concept": concept_name,
-                    "company_cik": company_cik,
-                    "statement_type": self.STATEMENT_TYPE
-                })
+                normalized_concept = normalized_concepts.get(concept_name)
                 
                 if normalized_concept:
                     if self.verbose:
@@ -441,24 +547,34 @@ class GrossProfitService:
     
     def _get_fiscal_years_for_company(self, company_cik: str) -> List[int]:
         """Get all fiscal years for a company."""
+        # Empty fiscal years are dropped in $match so they aren't grouped; the truthiness
+        # check below still drops the other falsy values (e.g. False) as before
         pipeline = [
-            {"$match": {"company_cik": company_cik}},
+            {
+                "$match": {
+                    "company_cik": company_cik,
+                    "reporting_period.fiscal_year": {"$nin": [None, 0]}
+                }
+            },
             {"$group": {"_id": "$reporting_period.fiscal_year"}},
             {"$sort": {"_id": 1}}
         ]
         
-        result = list(self.concept_values_quarterly.aggregate(pipeline))
-        return [item["_id"] for item in result if item["_id"]]
+        cursor = self.concept_values_quarterly.aggregate(pipeline)
+        return [item["_id"] for item in cursor if item["_id"]]
     
     def _get_all_companies(self) -> List[str]:
         """Get all unique company CIKs."""
+        # Sorting on the company_cik index prefix before grouping lets the server read
+        # one index entry per CIK (DISTINCT_SCAN) once ensure_indexes has run; without
+        # the index the sort may spill to disk instead of failing on the memory limit
         pipeline = [
-            {"$group": {"_id": "$company_cik"}},
-            {"$sort": {"_id": 1}}
+            {"$sort": {"company_cik": 1}},
+            {"$group": {"_id": "$company_cik"}}
         ]
         
-        result = list(self.normalized_concepts_quarterly.aggregate(pipeline))
-        return [item["_id"] for item in result if item["_id"]]
+        cursor = self.normalized_concepts_quarterly.aggregate(pipeline, allowDiskUse=True)
+        return sorted(item["_id"] for item in cursor if item["_id"])
     
     def _process_fiscal_year(
         self,
@@ -470,10 +586,17 @@ class GrossProfitService:
         cost_annual_concept: Optional[Dict[str, Any]],
         gross_profit_quarterly_concept: Dict[str, Any],
         gross_profit_annual_concept: Dict[str, Any],
-        recalculate: bool
+        recalculate: bool,
+        resolved_annual_concepts: Optional[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+        annual_values: Optional[Dict[Tuple[ObjectId, int], Dict[str, Any]]] = None,
+        quarterly_values: Optional[Dict[Tuple[ObjectId, int], Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """Process a single fiscal year for Gross Profit calculation.
         
+        resolved_annual_concepts and annual_values are the company-level prefetches
+        passed through to _calculate_and_insert_annual_value; quarterly_values is this
+        year's entry from _get_quarterly_values_by_year.
+        
         Returns:
             Dictionary with results for this fiscal year
         """
@@ -487,6 +610,18 @@ class GrossProfitService:
         
         # Process quarterly values (Q1, Q2, Q3, Q4) if we have quarterly concepts
         if revenue_quarterly_concept and cost_quarterly_concept:
+            # Load gross profit, revenue and cost values for all four quarters at once
+            if quarterly_values is None:
+                quarterly_values = self._get_quarterly_values_for_year(
+                    company_cik,
+                    fiscal_year,
+                    [
+                        gross_profit_quarterly_concept["_id"],
+                        revenue_quarterly_concept["_id"],
+                        cost_quarterly_concept["_id"]
+                    ]
+                )
+            
             for quarter in [1, 2, 3, 4]:
                 try:
                     inserted = self._calculate_and_insert_quarterly_value(
@@ -496,7 +631,8 @@ class GrossProfitService:
                         revenue_quarterly_concept,
                         cost_quarterly_concept,
                         gross_profit_quarterly_concept,
-                        recalculate
+                        recalculate,
+                        quarterly_values
                     )
                     if inserted:
                         results["quarterly_inserted"] += 1
@@ -515,7 +651,9 @@ class GrossProfitService:
                     revenue_annual_concept,
                     cost_annual_concept,
                     gross_profit_annual_concept,
-                    recalculate
+                    recalculate,
+                    resolved_annual_concepts,
+                    annual_values
                 )
                 if inserted:
                     results["annual_inserted"] += 1
@@ -527,6 +665,87 @@ class GrossProfitService:
         
         return results
     
+    def _get_quarterly_values_for_year(
+        self,
+        company_cik: str,
+        fiscal_year: int,
+        concept_ids: List[ObjectId]
+    ) -> Dict[Tuple[ObjectId, int], Dict[str, Any]]:
+        """Get quarterly value documents for several concepts in one query.
+        
+        Returns:
+            Dictionary keyed by (concept_id, quarter); the first document found wins,
+            matching what a per-period find_one would return
+        """
+        values: Dict[Tuple[ObjectId, int], Dict[str, Any]] = {}
+        for doc in self.concept_values_quarterly.find({
+            "concept_id": {"$in": concept_ids},
+            "company_cik": company_cik,
+            "reporting_period.fiscal_year": fiscal_year,
+            "reporting_period.quarter": {"$in": [1, 2, 3, 4]}
+        }, self.VALUE_PROJECTION):
+            key = (doc["concept_id"], doc["reporting_period"]["quarter"])
+            values.setdefault(key, doc)
+        return values
+    
+    def _get_quarterly_values_by_year(
+        self,
+        company_cik: str,
+        concept_ids: List[ObjectId]
+    ) -> Dict[int, Dict[Tuple[ObjectId, int], Dict[str, Any]]]:
+        """Get quarterly value documents for several concepts across all fiscal years.
+        
+        Values are grouped by fiscal year on the server, so one round-trip replaces
+        a query per year.
+        
+        Returns:
+            Dictionary of fiscal_year -> {(concept_id, quarter): document}, in the same
+            shape as _get_quarterly_values_for_year
+        """
+        pipeline = [
+            {
+                "$match": {
+                    "concept_id": {"$in": concept_ids},
+                    "company_cik": company_cik,
+                    "reporting_period.quarter": {"$in": [1, 2, 3, 4]}
+                }
+            },
+            {"$project": self.VALUE_PROJECTION},
+            {
+                "$group": {
+                    "_id": "$reporting_period.fiscal_year",
+                    "values": {"$push": "$$ROOT"}
+                }
+            }
+        ]
+        
+        values_by_year: Dict[int, Dict[Tuple[ObjectId, int], Dict[str, Any]]] = {}
+        for group in self.concept_values_quarterly.aggregate(pipeline, allowDiskUse=True):
+            year_values = values_by_year.setdefault(group["_id"], {})
+            for doc in group["values"]:
+                key = (doc["concept_id"], doc["reporting_period"]["quarter"])
+                year_values.setdefault(key, doc)
+        return values_by_year
+    
+    def _get_quarterly_value(
+        self,
+        concept_id: ObjectId,
+        company_cik: str,
+        fiscal_year: int,
+        quarter: int,
+        quarterly_values: Optional[Dict[Tuple[ObjectId, int], Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Get a quarterly value document from the prefetched map, or the database."""
+        if quarterly_values is not None:
+            return quarterly_values.get((concept_id, quarter))
+        
+        return self.concept_values_quarterly.find_one({
+            "concept_id": concept_id,
+            "company_cik": company_cik,
+            "reporting_period.fiscal_year": fiscal_year,
+            "reporting_period.quarter": quarter
+        }, self.VALUE_PROJECTION)
+    
     def _calculate_and_insert_quarterly_value(
         self,
         company_cik: str,
@@ -535,7 +754,8 @@ class GrossProfitService:
         revenue_concept: Dict[str, Any],
         cost_concept: Dict[str, Any],
         gross_profit_concept: Dict[str, Any],
-        recalculate: bool
+        recalculate: bool,
+        quarterly_values: Optional[Dict[Tuple[ObjectId, int], Dict[str, Any]]] = None
     ) -> bool:
         """Calculate and insert quarterly Gross Profit value.
         
@@ -545,16 +765,16 @@ class GrossProfitService:
         - If value DOESN'T EXIST: INSERT (create new)
         - If revenue or cost values missing: SKIP (can't calculate)
         
+        Args:
+            quarterly_values: Optional prefetched values from _get_quarterly_values_for_year
+        
         Returns:
             True if value was inserted/updated, False if skipped
         """
         # Check if Gross Profit value already exists for this period
-        existing_value = self.concept_values_quarterly.find_one({
-            "concept_id": gross_profit_concept["_id"],
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year,
-            "reporting_period.quarter": quarter
-        })
+        existing_value = self._get_quarterly_value(
+            gross_profit_concept["_id"], company_cik, fiscal_year, quarter, quarterly_values
+        )
         
         # If value exists and we're not recalculating, skip this period
         if existing_value and not recalculate:
@@ -563,12 +783,9 @@ class GrossProfitService:
             return False
         
         # Get revenue value
-        revenue_value_doc = self.concept_values_quarterly.find_one({
-            "concept_id": revenue_concept["_id"],
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year,
-            "reporting_period.quarter": quarter
-        })
+        revenue_value_doc = self._get_quarterly_value(
+            revenue_concept["_id"], company_cik, fiscal_year, quarter, quarterly_values
+        )
         
         if not revenue_value_doc:
             if self.verbose:
@@ -576,12 +793,9 @@ class GrossProfitService:
             return False
         
         # Get cost value
-        cost_value_doc = self.concept_values_quarterly.find_one({
-            "concept_id": cost_concept["_id"],
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year,
-            "reporting_period.quarter": quarter
-        })
+        cost_value_doc = self._get_quarterly_value(
+            cost_concept["_id"], company_cik, fiscal_year, quarter, quarterly_values
+        )
         
         if not cost_value_doc:
             if self.verbose:
@@ -623,6 +837,70 @@ class GrossProfitService:
         
         return True
     
+    def _resolve_annual_concepts(
+        self,
+        company_cik: str,
+        revenue_concept: Dict[str, Any],
+        cost_concept: Dict[str, Any]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Look up the annual revenue and cost concepts by concept name.
+        
+        Returns:
+            Tuple of (revenue_annual_concept, cost_annual_concept)
+        """
+        revenue_annual_concept = self.normalized_concepts_annual.find_one({
+            "company_cik": company_cik,
+            "concept": revenue_concept["concept"],
+            "statement_type": self.STATEMENT_TYPE
+        }, self.repository.CONCEPT_MATCH_PROJECTION)
+        
+        cost_annual_concept = self.normalized_concepts_annual.find_one({
+            "company_cik": company_cik,
+            "concept": cost_concept["concept"],
+            "statement_type": self.STATEMENT_TYPE
+        }, self.repository.CONCEPT_MATCH_PROJECTION)
+        
+        return revenue_annual_concept, cost_annual_concept
+    
+    def _get_annual_values_for_years(
+        self,
+        company_cik: str,
+        fiscal_years: List[int],
+        concept_ids: List[ObjectId]
+    ) -> Dict[Tuple[ObjectId, int], Dict[str, Any]]:
+        """Get annual value documents for several concepts and fiscal years in one query.
+        
+        Returns:
+            Dictionary keyed by (concept_id, fiscal_year); the first document found wins,
+            matching what a per-year find_one would return
+        """
+        values: Dict[Tuple[ObjectId, int], Dict[str, Any]] = {}
+        for doc in self.concept_values_annual.find({
+            "concept_id": {"$in": concept_ids},
+            "company_cik": company_cik,
+            "reporting_period.fiscal_year": {"$in": fiscal_years}
+        }, self.VALUE_PROJECTION):
+            key = (doc["concept_id"], doc["reporting_period"]["fiscal_year"])
+            values.setdefault(key, doc)
+        return values
+    
+    def _get_annual_value(
+        self,
+        concept_id: ObjectId,
+        company_cik: str,
+        fiscal_year: int,
+        annual_values: Optional[Dict[Tuple[ObjectId, int], Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Get an annual value document from the prefetched map, or the database."""
+        if annual_values is not None:
+            return annual_values.get((concept_id, fiscal_year))
+        
+        return self.concept_values_annual.find_one({
+            "concept_id": concept_id,
+            "company_cik": company_cik,
+            "reporting_period.fiscal_year": fiscal_year
+        }, self.VALUE_PROJECTION)
+    
     def _calculate_and_insert_annual_value(
         self,
         company_cik: str,
@@ -630,7 +908,9 @@ class GrossProfitService:
         revenue_concept: Dict[str, Any],
         cost_concept: Dict[str, Any],
         gross_profit_concept: Dict[str, Any],
-        recalculate: bool
+        recalculate: bool,
+        resolved_annual_concepts: Optional[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+        annual_values: Optional[Dict[Tuple[ObjectId, int], Dict[str, Any]]] = None
     ) -> bool:
         """Calculate and insert annual Gross Profit value.
         
@@ -640,15 +920,17 @@ class GrossProfitService:
         - If value DOESN'T EXIST: INSERT (create new)
         - If revenue or cost values missing: SKIP (can't calculate)
         
+        Args:
+            resolved_annual_concepts: Optional prefetched result of _resolve_annual_concepts
+            annual_values: Optional prefetched values from _get_annual_values_for_years
+        
         Returns:
             True if value was inserted/updated, False if skipped
         """
         # Check if Gross Profit value already exists for this fiscal year
-        existing_value = self.concept_values_annual.find_one({
-            "concept_id": gross_profit_concept["_id"],
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year
-        })
+        existing_value = self._get_annual_value(
+            gross_profit_concept["_id"], company_cik, fiscal_year, annual_values
+        )
         
         # If value exists and we're not recalculating, skip this period
         if existing_value and not recalculate:
@@ -657,17 +939,11 @@ class GrossProfitService:
             return False
         
         # For annual values, we need to look up the annual concept IDs
-        revenue_annual_concept = self.normalized_concepts_annual.find_one({
-            "company_cik": company_cik,
-            "concept": revenue_concept["concept"],
-            "statement_type": self.STATEMENT_TYPE
-        })
-        
-        cost_annual_concept = self.normalized_concepts_annual.find_one({
-            "company_cik": company_cik,
-            "concept": cost_concept["concept"],
-            "statement_type": self.STATEMENT_TYPE
-        })
+        if resolved_annual_concepts is None:
+            resolved_annual_concepts = self._resolve_annual_concepts(
+                company_cik, revenue_concept, cost_concept
+            )
+        revenue_annual_concept, cost_annual_concept = resolved_annual_concepts
         
         if not revenue_annual_concept or not cost_annual_concept:
             if self.verbose:
@@ -675,11 +951,9 @@ class GrossProfitService:
             return False
         
         # Get revenue value
-        revenue_value_doc = self.concept_values_annual.find_one({
-            "concept_id": revenue_annual_concept["_id"],
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year
-        })
+        revenue_value_doc = self._get_annual_value(
+            revenue_annual_concept["_id"], company_cik, fiscal_year, annual_values
+        )
         
         if not revenue_value_doc:
             if self.verbose:
@@ -687,11 +961,9 @@ class GrossProfitService:
             return False
         
         # Get cost value
-        cost_value_doc = self.concept_values_annual.find_one({
-            "concept_id": cost_annual_concept["_id"],
-            "company_cik": company_cik,
-            "reporting_period.fiscal_year": fiscal_year
-        })
+        cost_value_doc = self._get_annual_value(
+            cost_annual_concept["_id"], company_cik, fiscal_year, annual_values
+        )
         
         if not cost_value_doc:
             if self.verbose:
@@ -1,10 +1,13 @@
 """Service for Q4 calculation business logic - Refactored with DRY principles."""
 
-from typing import Dict, Any, Optional, List
+import logging
+import re
+from typing import Dict, Any, Optional, List, Set, Tuple
 from datetime import datetime
 
 try:
     from bson import ObjectId
+    from pymongo.errors import OperationFailure
 except ImportError:
     print("PyMongo not installed. Please run: pip install pymongo")
     raise
@@ -53,9 +56,17 @@ class Q4CalculationService:
         "OpeningBalance"
     ]
     
+    # All patterns folded into one case-insensitive alternation, so a concept is
+    # checked with a single regex search instead of a loop over every pattern
+    POINT_IN_TIME_RE = re.compile(
+        "|".join(re.escape(pattern) for pattern in POINT_IN_TIME_PATTERNS),
+        re.IGNORECASE
+    )
+    
     def __init__(self, repository: FinancialDataRepository, verbose: bool = False):
         self.repository = repository
         self.verbose = verbose
+        self.logger = logging.getLogger(__name__)
     
     # ==================== HELPER METHODS ====================
     
@@ -65,15 +76,10 @@ class Q4CalculationService:
         Point-in-time concepts represent snapshots at specific dates (like cash balances)
         rather than flows over a period, so Q4 = Annual - (Q1+Q2+Q3) doesn't apply.
         """
-        concept_lower = concept_name.lower()
-        label_lower = label.lower()
-        
-        for pattern in self.POINT_IN_TIME_PATTERNS:
-            pattern_lower = pattern.lower()
-            if pattern_lower in concept_lower or pattern_lower in label_lower:
-                return True
-        
-        return False
+        return bool(
+            self.POINT_IN_TIME_RE.search(concept_name)
+            or (label and self.POINT_IN_TIME_RE.search(label))
+        )
     
     def _create_q4_reporting_period(
         self,
@@ -150,21 +156,17 @@ class Q4CalculationService:
         )
         
         # If not found, try alternative matching using parent concept lookup
+        # (find_matching_concept_by_parent returns None when there is no root parent)
         if not annual_metadata:
-            quarterly_parent_name = self.repository.get_root_parent_concept_name(
-                quarterly_concept_id, "normalized_concepts_quarterly"
+            annual_concept = self.repository.find_matching_concept_by_parent(
+                concept_name, quarterly_concept_id, "normalized_concepts_annual", company_cik
             )
-            if quarterly_parent_name:
-                annual_concept = self.repository.find_matching_concept_by_parent(
-                    concept_name, quarterly_concept_id, "normalized_concepts_annual", company_cik
-                )
-                
-                if annual_concept:
-                    annual_metadata = self.repository.db["concept_values_annual"].find_one({
-                        "concept_id": annual_concept["_id"],
-                        "company_cik": company_cik,
-                        "reporting_period.fiscal_year": fiscal_year
-                    })
+            
+            if annual_concept:
+                # All fiscal years of the matched concept come back in one (memoized) query
+                annual_metadata = self.repository.get_annual_records_by_fiscal_year(
+                    annual_concept["_id"], company_cik
+                ).get(fiscal_year)
         
         if not annual_metadata:
             return None
@@ -180,13 +182,20 @@ class Q4CalculationService:
         company_cik: str, 
         fiscal_year: int,
         statement_type: str,
-        quarterly_concept: Optional[Dict[str, Any]] = None
+        quarterly_concept: Optional[Dict[str, Any]] = None,
+        existing_q4_keys: Optional[Set[Tuple[ObjectId, int]]] = None,
+        quarterly_values_by_year: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+        is_point_in_time: Optional[bool] = None
     ) -> Dict[str, Any]:
         """Calculate Q4 for any statement type - unified calculation method.
         
         This method handles all Q4 calculations regardless of statement type.
         For dimensional concepts with same path, quarterly_concept should be passed
-        to ensure correct concept matching.
+        to ensure correct concept matching. existing_q4_keys, when given, is the
+        prefetched set of (concept_id, fiscal_year) pairs that already have Q4, and
+        quarterly_values_by_year the concept's prefetched Q1-Q3 values.
+        is_point_in_time, when given, is the concept's precomputed
+        _is_point_in_time_concept result.
         """
         result = {"success": False, "reason": None, "is_point_in_time": False}
         
@@ -194,7 +203,12 @@ class Q4CalculationService:
             # For dimensional concepts with same path, use concept_id directly
             if quarterly_concept and quarterly_concept.get("_id"):
                 quarterly_data = self.repository.get_quarterly_data_by_concept_id(
-                    quarterly_concept["_id"], company_cik, fiscal_year, statement_type
+                    quarterly_concept["_id"], company_cik, fiscal_year, statement_type,
+                    quarterly_concept=quarterly_concept,
+                    quarterly_values=(
+                        quarterly_values_by_year.get(fiscal_year, [])
+                        if quarterly_values_by_year is not None else None
+                    )
                 )
             else:
                 # Fallback to path-based lookup for non-dimensional concepts
@@ -208,16 +222,22 @@ class Q4CalculationService:
                 return result
             
             # Check if Q4 already exists using concept_id (more reliable)
-            if self.repository.check_q4_exists(
-                quarterly_data.concept_id, company_cik, fiscal_year
-            ):
+            if existing_q4_keys is not None:
+                q4_exists = (quarterly_data.concept_id, fiscal_year) in existing_q4_keys
+            else:
+                q4_exists = self.repository.check_q4_exists(
+                    quarterly_data.concept_id, company_cik, fiscal_year
+                )
+            
+            if q4_exists:
                 result["reason"] = "Q4 value already exists"
                 return result
             
             # Check if this is a point-in-time concept
             # For point-in-time concepts, Q4 value = Annual value (not calculated)
-            label = quarterly_concept.get("label", "") if quarterly_concept else ""
-            is_point_in_time = self._is_point_in_time_concept(concept_name, label)
+            if is_point_in_time is None:
+                label = quarterly_concept.get("label", "") if quarterly_concept else ""
+                is_point_in_time = self._is_point_in_time_concept(concept_name, label)
             
             if is_point_in_time:
                 # For point-in-time concepts, copy annual value to Q4
@@ -296,11 +316,32 @@ class Q4CalculationService:
                 results["errors"].append(f"No fiscal years found for company {company_cik}")
                 return results
             
+            # Load existing Q4 values once instead of checking per concept/year
+            existing_q4_keys = self.repository.get_existing_q4_keys(company_cik)
+            
             # Process each concept for each fiscal year
             for concept in concepts:
                 concept_name = concept.get("concept", "Unknown")
                 concept_path = concept.get("path", "")
                 
+                # Load Q1-Q3 values for all fiscal years of this concept in one query
+                # (if the server rejects the aggregation, fall back to the per-year lookups)
+                try:
+                    quarterly_values_by_year = self.repository.get_quarterly_values_by_fiscal_year(
+                        concept["_id"], company_cik
+                    )
+                except OperationFailure as e:
+                    self.logger.warning(
+                        "Grouped quarterly value lookup failed for %s (%s), using per-year lookups: %s",
+                        concept_name, company_cik, e
+                    )
+                    quarterly_values_by_year = None
+                
+                # Point-in-time classification depends only on the concept name and label
+                is_point_in_time = self._is_point_in_time_concept(
+                    concept_name, concept.get("label", "")
+                )
+                
                 for fiscal_year in fiscal_years:
                     try:
                         result = self._calculate_q4_generic(
@@ -309,7 +350,10 @@ class Q4CalculationService:
                             company_cik, 
                             fiscal_year,
                             statement_type,
-                            quarterly_concept=concept  # Pass the full concept document
+                            quarterly_concept=concept,  # Pass the full concept document
+                            existing_q4_keys=existing_q4_keys,
+                            quarterly_values_by_year=quarterly_values_by_year,
+                            is_point_in_time=is_point_in_time
                         )
                         
                         results["processed_concepts"] += 1
@@ -341,11 +385,23 @@ class Q4CalculationService:
         
         return results
     
+    def _run_statement_pass(
+        self,
+        company_cik: str,
+        statement_type: str,
+        get_concepts_method
+    ) -> Dict[str, Any]:
+        """Run one company/statement pass with its lookups memoized for the pass only."""
+        with self.repository.lookup_cache_scope():
+            return self._calculate_q4_for_statement_type(
+                company_cik, statement_type, get_concepts_method
+            )
+    
     # ==================== PUBLIC API METHODS ====================
     
     def calculate_q4_for_company(self, company_cik: str) -> Dict[str, Any]:
         """Calculate Q4 values for all income statement concepts of a company."""
-        return self._calculate_q4_for_statement_type(
+        return self._run_statement_pass(
             company_cik,
             "income_statement",
             self.repository.get_income_statement_concepts
@@ -353,7 +409,7 @@ class Q4CalculationService:
     
     def calculate_q4_for_cash_flow(self, company_cik: str) -> Dict[str, Any]:
         """Calculate Q4 values for all cash flow statement concepts of a company."""
-        return self._calculate_q4_for_statement_type(
+        return self._run_statement_pass(
             company_cik,
             "cash_flows",
             self.repository.get_cash_flow_concepts
@@ -379,7 +435,9 @@ class Q4CalculationService:
         concept_name: str = "Unknown"
     ) -> Dict[str, Any]:
         """Legacy method - Calculate Q4 by concept_id."""
-        concept = self.repository.normalized_concepts_quarterly.find_one({"_id": concept_id})
+        concept = self.repository.normalized_concepts_quarterly.find_one(
+            {"_id": concept_id}, self.repository.CONCEPT_MATCH_PROJECTION
+        )
         if not concept:
             return {"success": False, "reason": "Concept not found"}
         